@@ -0,0 +1,270 @@
+import logging
+import threading
+import time
+from pathlib import Path
+
+from ..engine.artifacts import artifact_exists, find_artifact, read_artifact
+from ..engine.changepoint import DETECTORS
+from ..engine.leaderboard import Leaderboard
+from ..engine.onset import CONSECUTIVE_DAYS, DRIFT_THRESHOLD, onset_frame, score_onsets
+from ..engine.sketch import QuantileSketches, load_sketches
+from ..engine.store import open_score_store, store_exists, store_version
+from .index import ChangepointIndex, DriftIndex, ExplanationIndex, OnsetIndex
+from .instrumentation import record_dataset
+
+logger = logging.getLogger(__name__)
+
+
+# -------------------------
+# Snapshot
+# -------------------------
+class Snapshot:
+    """
+    One immutable, fully indexed copy of the served data.
+
+    Handlers take a reference once per request, so a swap never changes the
+    data under a request in flight; memory maps of a replaced store stay
+    valid until the last reference goes away.
+    """
+
+    def __init__(
+        self,
+        version,
+        drift_index,
+        explain_index,
+        leaderboard,
+        onset_index,
+        changepoint_index,
+        sketches,
+    ):
+        self.version = version
+        self.drift_index = drift_index
+        self.explain_index = explain_index
+        self.leaderboard = leaderboard
+        self.onset_index = onset_index
+        self.changepoint_index = changepoint_index
+        self.sketches = sketches
+
+    def index_arrays(self):
+        """dataset name -> index arrays, for the dataset metrics"""
+        return {
+            "scores": [self.drift_index.days, self.drift_index.scores],
+            "explanations": [
+                self.explain_index.contributions,
+                self.explain_index.feature_codes,
+                self.explain_index.direction_codes,
+            ],
+            "leaderboard": [
+                self.leaderboard.stats,
+                self.leaderboard.latest_days,
+                self.leaderboard.order,
+                self.leaderboard.ranked,
+            ],
+            "onsets": [self.onset_index.onset_days],
+            "changepoints": [
+                array
+                for arrays in self.changepoint_index.detectors.values()
+                for array in arrays.values()
+            ],
+            "sketches": [self.sketches.means, self.sketches.weights],
+        }
+
+
+# -------------------------
+# Loading
+# -------------------------
+def artifact_stems(data_dir):
+    """drift, explanation, leaderboard and onset artifact stems"""
+    data_dir = Path(data_dir)
+    return [
+        data_dir / "drift_scores",
+        data_dir / "drift_explanations",
+        data_dir / "drift_leaderboard",
+        data_dir / "drift_onsets",
+    ]
+
+
+def changepoint_stem(data_dir):
+    """Artifact written by the change-point stage (optional)"""
+    return Path(data_dir) / "drift_changepoints"
+
+
+def sketch_path(data_dir):
+    """Population sketches written by the pipeline (optional)"""
+    return Path(data_dir) / "population_sketches.npz"
+
+
+def data_version(data_dir):
+    """
+    Cheap version tag of the data on disk, without loading it.
+
+    The score store's current version when there is one, otherwise the
+    latest modification time of the artifacts, plus the modification times
+    of the change-point artifact and population sketches when there are any.
+    """
+    store_path = Path(data_dir) / "score_store"
+    if store_exists(store_path):
+        version = store_version(store_path)
+    else:
+        version = _mtime_version(
+            find_artifact(stem)[0]
+            for stem in artifact_stems(data_dir)
+            if artifact_exists(stem)
+        )
+
+    # Detectors are updated on their own schedule (daily updates)
+    changepoints = changepoint_stem(data_dir)
+    if artifact_exists(changepoints):
+        version += "-" + _mtime_version([find_artifact(changepoints)[0]])
+    if sketch_path(data_dir).exists():
+        version += "-" + _mtime_version([sketch_path(data_dir)])
+
+    return version
+
+
+def _mtime_version(paths):
+    return format(max(Path(path).stat().st_mtime_ns for path in paths), "x")
+
+
+def load_snapshot(data_dir):
+    """
+    Build every index from the data directory.
+
+    When the scoring stage has written a score store, arrays are
+    memory-mapped so every worker shares the same pages instead of holding
+    its own copy; otherwise the artifacts are read into memory.
+    """
+    version = data_version(data_dir)
+    store_path = Path(data_dir) / "score_store"
+
+    changepoints = changepoint_stem(data_dir)
+    changepoint_index = (
+        ChangepointIndex.from_frame(read_artifact(changepoints), DETECTORS)
+        if artifact_exists(changepoints)
+        else ChangepointIndex.empty(DETECTORS)
+    )
+    sketches = (
+        load_sketches(sketch_path(data_dir))
+        if sketch_path(data_dir).exists()
+        else QuantileSketches.empty()
+    )
+
+    if store_exists(store_path):
+        store = open_score_store(store_path)
+        drift_index = DriftIndex.from_store(store)
+        return Snapshot(
+            version,
+            drift_index,
+            ExplanationIndex.from_store(store),
+            Leaderboard.from_store(store),
+            OnsetIndex.from_store(drift_index, store),
+            changepoint_index,
+            sketches,
+        )
+
+    drift_path, explain_path, leaderboard_path, onset_path = artifact_stems(data_dir)
+    drift_df = read_artifact(drift_path)
+    drift_index = DriftIndex.from_frame(drift_df)
+
+    leaderboard = (
+        Leaderboard.from_frame(read_artifact(leaderboard_path))
+        if artifact_exists(leaderboard_path)
+        else Leaderboard.from_scores(drift_df)
+    )
+    onset_df = (
+        read_artifact(onset_path)
+        if artifact_exists(onset_path)
+        else onset_frame(*score_onsets(drift_df, DRIFT_THRESHOLD, CONSECUTIVE_DAYS))
+    )
+
+    return Snapshot(
+        version,
+        drift_index,
+        ExplanationIndex.from_frame(read_artifact(explain_path)),
+        leaderboard,
+        OnsetIndex.from_frame(drift_index, onset_df),
+        changepoint_index,
+        sketches,
+    )
+
+
+# -------------------------
+# Hot-swappable dataset
+# -------------------------
+class Dataset:
+    """
+    Serves the current Snapshot and replaces it when the data changes.
+
+    `start` loads in a background thread (the app answers /health while
+    loading) and, with `poll_seconds` > 0, keeps watching the data version.
+    `reload` builds a new snapshot off to the side and publishes it with a
+    single reference swap. Reloads are serialized; readers never lock.
+    """
+
+    def __init__(self, data_dir, poll_seconds=0):
+        self.data_dir = Path(data_dir)
+        self.poll_seconds = poll_seconds
+        self.current = None
+        self.reload_failed = False
+        self._reload_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    @property
+    def ready(self):
+        return self.current is not None
+
+    def snapshot(self):
+        """The current snapshot, or None while the first load is running"""
+        return self.current
+
+    def reload(self, force=False):
+        """
+        Load and publish a new snapshot if the version on disk changed.
+
+        Returns True when a new snapshot was published. A load that races
+        with a writer (version changed while loading) is discarded and left
+        for the next reload.
+        """
+        with self._reload_lock:
+            version = data_version(self.data_dir)
+            if not force and self.current is not None and self.current.version == version:
+                return False
+
+            start = time.perf_counter()
+            snapshot = load_snapshot(self.data_dir)
+            if data_version(self.data_dir) != snapshot.version:
+                return False
+
+            self.current = snapshot
+            self.reload_failed = False
+            record_dataset(time.perf_counter() - start, snapshot.index_arrays())
+            return True
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                self.reload()
+            except Exception:  # keep serving the last good snapshot
+                logger.exception("Background dataset reload failed")
+                self.reload_failed = True
+
+            if self.poll_seconds <= 0 and self.ready:
+                return
+            self._stopped.wait(self.poll_seconds if self.ready else 1.0)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="dataset-loader", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def wait(self, timeout=None):
+        """Block until the first snapshot is published"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.ready:
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.05)
+        return True
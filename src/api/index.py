@@ -0,0 +1,378 @@
+import numpy as np
+
+from ..engine.keys import key_names, key_offsets, key_positions
+
+
+# -------------------------
+# User lookup
+# -------------------------
+def user_positions(users):
+    """O(1) user -> position table for in-memory indexes"""
+    return {str(user_id): i for i, user_id in enumerate(users)}
+
+
+def resolve_users(users, user_ids):
+    """
+    Positions of many user ids in a sorted user array, -1 where unknown.
+
+    One vectorized binary search for the whole batch.
+    """
+    query = np.asarray(user_ids, dtype=str)
+    if len(users) == 0 or len(query) == 0:
+        return np.full(len(query), -1, dtype=np.int64)
+
+    positions = np.minimum(np.searchsorted(users, query), len(users) - 1)
+    return np.where(users[positions] == query, positions, -1)
+
+
+def gather_ranges(starts, ends):
+    """Flat row indices covering every [start, end) range, and range lengths"""
+    lengths = ends - starts
+    shift = np.repeat(starts - np.r_[0, np.cumsum(lengths)[:-1]], lengths)
+    return np.arange(lengths.sum()) + shift, lengths
+
+
+class SortedUserLookup:
+    """
+    dict-style `.get()` over a sorted (possibly memory-mapped) user array.
+
+    Used with the score store so workers don't each hold a Python dict of
+    every user; a lookup is one binary search.
+    """
+
+    def __init__(self, users):
+        self.users = users
+
+    def get(self, user_id, default=None):
+        i = int(np.searchsorted(self.users, user_id))
+        if i < len(self.users) and self.users[i] == user_id:
+            return i
+        return default
+
+    def __len__(self):
+        return len(self.users)
+
+
+# -------------------------
+# Drift score index
+# -------------------------
+class DriftIndex:
+    """
+    Per-user offset ranges into contiguous, day-sorted score arrays.
+
+    Arrays may be in memory or memory-mapped from the score store; lookups
+    are a user hit plus a zero-copy slice.
+    """
+
+    def __init__(self, users, offsets, days, scores, positions=None):
+        self.users = users
+        self.offsets = offsets
+        self.days = days
+        self.scores = scores
+        self.positions = positions if positions is not None else user_positions(users)
+
+    @classmethod
+    def from_frame(cls, df):
+        df = df.sort_values(by=["user_id", "day"], kind="stable")
+        users, offsets = key_offsets(df["user_id"])
+        return cls(
+            users,
+            offsets,
+            df["day"].to_numpy(dtype=np.int64),
+            df["drift_score"].to_numpy(dtype=np.float64),
+        )
+
+    @classmethod
+    def from_store(cls, store):
+        return cls(
+            store["users"],
+            store["offsets"],
+            store["days"],
+            store["scores"],
+            SortedUserLookup(store["users"]),
+        )
+
+    def timeline(self, user_id):
+        """(days, scores) views for a user, or None if unknown"""
+        i = self.positions.get(user_id)
+        if i is None:
+            return None
+
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return self.days[start:end], self.scores[start:end]
+
+    def latest(self, user_id):
+        """(day, score) of the most recent row for a user, or None"""
+        i = self.positions.get(user_id)
+        if i is None:
+            return None
+
+        last = self.offsets[i + 1] - 1
+        return int(self.days[last]), float(self.scores[last])
+
+    # Batch lookups take positions from `resolve` (all must be >= 0)
+    def resolve(self, user_ids):
+        return resolve_users(self.users, user_ids)
+
+    def latest_many(self, positions):
+        """(days, scores) of the most recent row for each position"""
+        last = self.offsets[positions + 1] - 1
+        return self.days[last], self.scores[last]
+
+    def timelines_many(self, positions):
+        """(lengths, days, scores): concatenated timelines for each position"""
+        rows, lengths = gather_ranges(
+            self.offsets[positions], self.offsets[positions + 1]
+        )
+        return lengths, self.days[rows], self.scores[rows]
+
+
+# -------------------------
+# Explanation index
+# -------------------------
+class ExplanationIndex:
+    """
+    Precomputed strongest-explanation day per user.
+
+    The strongest day is the one with the largest total |contribution|
+    (earliest on ties); its explanation rows are kept as a contiguous slice.
+    Features and directions are stored as codes into small name tables.
+    """
+
+    def __init__(
+        self,
+        users,
+        offsets,
+        days,
+        feature_codes,
+        feature_names,
+        contributions,
+        direction_codes,
+        direction_names,
+        positions=None,
+    ):
+        self.users = users
+        self.feature_codes = feature_codes
+        self.feature_names = np.asarray(feature_names, dtype=object)
+        self.contributions = contributions
+        self.direction_codes = direction_codes
+        self.direction_names = np.asarray(direction_names, dtype=object)
+        self.positions = positions if positions is not None else user_positions(users)
+
+        # One group per (user, day)
+        n = len(days)
+        boundary = np.zeros(n, dtype=bool)
+        if n:
+            boundary[0] = True
+            boundary[1:] = days[1:] != days[:-1]
+            boundary[offsets[:-1][offsets[:-1] < n]] = True
+
+        group_starts = np.flatnonzero(boundary)
+        group_ends = np.r_[group_starts[1:], n].astype(np.int64)
+        group_users = np.searchsorted(offsets, group_starts, side="right") - 1
+
+        totals = (
+            np.add.reduceat(np.abs(contributions), group_starts, dtype=np.float64)
+            if n else np.zeros(0)
+        )
+
+        # Strongest group per user, earliest day on ties
+        order = np.lexsort((np.arange(len(group_starts)), -totals, group_users))
+        ranked_users = group_users[order]
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = ranked_users[1:] != ranked_users[:-1]
+        best = order[first]
+
+        self.days = np.asarray(days[group_starts[best]])
+        self.starts = group_starts[best]
+        self.ends = group_ends[best]
+
+    @classmethod
+    def from_frame(cls, df):
+        df = df.sort_values(by=["user_id", "day"], kind="stable")
+        users, offsets = key_offsets(df["user_id"])
+        feature_names, feature_codes = key_names(df["feature"])
+        direction_names, direction_codes = key_names(df["direction"])
+        return cls(
+            users,
+            offsets,
+            df["day"].to_numpy(dtype=np.int64),
+            feature_codes,
+            feature_names,
+            df["contribution"].to_numpy(dtype=np.float64),
+            direction_codes,
+            direction_names,
+        )
+
+    @classmethod
+    def from_store(cls, store):
+        return cls(
+            store["explain_users"],
+            store["explain_offsets"],
+            store["explain_days"],
+            store["explain_feature_codes"],
+            store["explain_feature_names"],
+            store["explain_contributions"],
+            store["explain_direction_codes"],
+            store["explain_direction_names"],
+            SortedUserLookup(store["explain_users"]),
+        )
+
+    def strongest(self, user_id):
+        """(day, features, contributions, directions) for a user, or None"""
+        i = self.positions.get(user_id)
+        if i is None:
+            return None
+
+        start, end = self.starts[i], self.ends[i]
+        return (
+            int(self.days[i]),
+            self.feature_names[self.feature_codes[start:end]],
+            self.contributions[start:end],
+            self.direction_names[self.direction_codes[start:end]],
+        )
+
+    def resolve(self, user_ids):
+        return resolve_users(self.users, user_ids)
+
+    def strongest_many(self, positions):
+        """(days, lengths, features, contributions, directions) per position"""
+        rows, lengths = gather_ranges(self.starts[positions], self.ends[positions])
+        return (
+            self.days[positions],
+            lengths,
+            self.feature_names[self.feature_codes[rows]],
+            self.contributions[rows],
+            self.direction_names[self.direction_codes[rows]],
+        )
+
+
+# -------------------------
+# Onset index
+# -------------------------
+class OnsetIndex:
+    """
+    Precomputed drift onset day per user, aligned with a DriftIndex.
+
+    Onsets come from the scoring stage (engine.onset); -1 marks users without
+    sustained drift.
+    """
+
+    def __init__(self, drift_index, onset_days):
+        self.positions = drift_index.positions
+        self.onset_days = onset_days
+
+    @classmethod
+    def from_frame(cls, drift_index, df):
+        """Align an onset frame (user_id, onset_day) with the drift index users"""
+        onset_days = np.full(len(drift_index.users), -1, dtype=np.int64)
+        positions = key_positions(df["user_id"], drift_index.users)
+        found = positions >= 0
+        onset_days[positions[found]] = df["onset_day"].to_numpy()[found]
+        return cls(drift_index, onset_days)
+
+    @classmethod
+    def from_store(cls, drift_index, store):
+        return cls(drift_index, store["onset_days"])
+
+    def onset(self, user_id):
+        """Onset day (-1 when none) for a user, or None if unknown"""
+        i = self.positions.get(user_id)
+        if i is None:
+            return None
+        return int(self.onset_days[i])
+
+
+# -------------------------
+# Change-point index
+# -------------------------
+class ChangepointIndex:
+    """
+    CUSUM / Page-Hinkley statistics and alarm days per user (one row each).
+
+    Written by the streaming change-point stage (engine.changepoint); -1
+    marks a detector that has not alarmed. Users are also kept ordered by
+    each detector's most recent alarm, so "alarmed since day D" is one
+    binary search plus a slice.
+    """
+
+    def __init__(self, users, last_days, detectors):
+        self.users = users
+        self.last_days = last_days
+        self.detectors = detectors  # name -> dict of per-user arrays
+        self.positions = user_positions(users)
+
+        # Most recent alarm first, users in id order on ties
+        self.alarm_order = {}
+        self.alarm_days_desc = {}
+        for name, arrays in detectors.items():
+            order = np.argsort(-arrays["last_alarm_day"], kind="stable")
+            self.alarm_order[name] = order
+            self.alarm_days_desc[name] = arrays["last_alarm_day"][order]
+
+    @classmethod
+    def from_frame(cls, df, detectors):
+        df = df.sort_values(by="user_id", kind="stable")
+        users, _ = key_offsets(df["user_id"])
+        return cls(
+            users,
+            df["last_day"].to_numpy(dtype=np.int64),
+            {
+                name: {
+                    "statistic": df[name].to_numpy(dtype=np.float64),
+                    "alarm_day": df[f"{name}_alarm_day"].to_numpy(dtype=np.int64),
+                    "last_alarm_day": df[f"{name}_last_alarm_day"].to_numpy(dtype=np.int64),
+                    "alarms": df[f"{name}_alarms"].to_numpy(dtype=np.int64),
+                }
+                for name in detectors
+            },
+        )
+
+    @classmethod
+    def empty(cls, detectors):
+        """Index for a dataset the change-point stage has not run on"""
+        return cls(
+            np.zeros(0, dtype=str),
+            np.zeros(0, dtype=np.int64),
+            {
+                name: {
+                    "statistic": np.zeros(0),
+                    "alarm_day": np.zeros(0, dtype=np.int64),
+                    "last_alarm_day": np.zeros(0, dtype=np.int64),
+                    "alarms": np.zeros(0, dtype=np.int64),
+                }
+                for name in detectors
+            },
+        )
+
+    def state(self, user_id):
+        """(last_day, {detector: (statistic, alarm_day, last_alarm_day, alarms)}), or None"""
+        i = self.positions.get(user_id)
+        if i is None:
+            return None
+
+        return int(self.last_days[i]), {
+            name: (
+                float(arrays["statistic"][i]),
+                int(arrays["alarm_day"][i]),
+                int(arrays["last_alarm_day"][i]),
+                int(arrays["alarms"][i]),
+            )
+            for name, arrays in self.detectors.items()
+        }
+
+    def alarmed_since(self, detector, since_day, limit):
+        """(total, positions): users whose latest alarm is on or after `since_day`"""
+        total = int(np.searchsorted(-self.alarm_days_desc[detector], -since_day, side="right"))
+        return total, self.alarm_order[detector][:min(total, limit)]
+
+    def rows(self, detector, positions):
+        """(users, statistics, alarm_days, last_alarm_days, alarms) per position"""
+        arrays = self.detectors[detector]
+        return (
+            self.users[positions],
+            arrays["statistic"][positions],
+            arrays["alarm_day"][positions],
+            arrays["last_alarm_day"][positions],
+            arrays["alarms"][positions],
+        )
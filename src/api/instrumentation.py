@@ -0,0 +1,99 @@
+import time
+
+from ..engine.metrics import Counter, Gauge, Histogram
+
+# -------------------------
+# Metric families
+# -------------------------
+REQUESTS = Counter(
+    "bdo_http_requests_total", "HTTP requests handled, by route", ["route"]
+)
+ERRORS = Counter(
+    "bdo_http_errors_total", "HTTP responses with status >= 400, by route", ["route"]
+)
+LATENCY = Histogram(
+    "bdo_http_request_duration_seconds", "End-to-end request latency, by route", ["route"]
+)
+LOOKUP = Histogram(
+    "bdo_api_lookup_seconds", "Time spent in per-user index lookups, by route", ["route"]
+)
+SERIALIZE = Histogram(
+    "bdo_api_serialize_seconds",
+    "Time spent on JSON response encoding from index arrays, by route",
+    ["route"],
+)
+
+DATASET_LOAD = Gauge(
+    "bdo_dataset_load_seconds", "Time taken to load datasets and build indexes"
+)
+DATASET_ROWS = Gauge("bdo_dataset_rows", "Rows loaded, by dataset", ["dataset"])
+DATASET_BYTES = Gauge(
+    "bdo_dataset_bytes", "Bytes held or mapped by index arrays, by dataset", ["dataset"]
+)
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+# -------------------------
+# Per-route timers
+# -------------------------
+def route_timers(route):
+    """(lookup, serialize) histogram children for an endpoint, bound once"""
+    return LOOKUP.labels(route), SERIALIZE.labels(route)
+
+
+def record_dataset(load_seconds, datasets):
+    """datasets: name -> list of index arrays"""
+    DATASET_LOAD.labels().set(load_seconds)
+    for name, arrays in datasets.items():
+        DATASET_ROWS.labels(name).set(len(arrays[0]))
+        DATASET_BYTES.labels(name).set(sum(array.nbytes for array in arrays))
+
+
+# -------------------------
+# ASGI middleware
+# -------------------------
+class MetricsMiddleware:
+    """
+    Counts requests and records latency per route template.
+
+    Children for every registered route are bound up front, so the request
+    path is a dict hit on the route template and a few list increments.
+    """
+
+    def __init__(self, app, routes=()):
+        self.app = app
+        self.routes = {}
+
+        for path in list(routes) + [UNMATCHED_ROUTE]:
+            self.routes[path] = (
+                REQUESTS.labels(path),
+                ERRORS.labels(path),
+                LATENCY.labels(path),
+            )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            requests, errors, latency = self.routes.get(
+                getattr(route, "path", UNMATCHED_ROUTE), self.routes[UNMATCHED_ROUTE]
+            )
+            requests.inc()
+            if status >= 400:
+                errors.inc()
+            latency.observe(time.perf_counter() - start)
@@ -1,14 +1,80 @@
-from fastapi import FastAPI, HTTPException
-import pandas as pd
+import hmac
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+
+import numpy as np
+from fastapi import FastAPI, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
 from pathlib import Path
+from typing import List, Optional, Union
 
+from ..engine.leaderboard import LEADERBOARD_STATS
+from ..engine.metrics import render_metrics
+from ..engine.sketch import SCORE_METRIC
+from .dataset import Dataset
+from .instrumentation import MetricsMiddleware, route_timers
+from .responses import FastJSONResponse, as_json_floats
 from .schemas import (
-    DriftPoint,
     DriftTimeline,
-    DriftExplanation,
+    CompactTimeline,
+    TimelineFormat,
     DriftExplanationResponse,
+    DriftOnset,
+    DriftSummary,
+    LatestDrift,
+    BulkRequest,
+    BulkLatestResponse,
+    BulkTimelineResponse,
+    BulkCompactTimelineResponse,
+    BulkExplanationResponse,
+    MAX_LEADERBOARD_K,
+    LeaderboardStat,
+    LeaderboardResponse,
+    LeaderboardRangeResponse,
+    ChangepointDetector,
+    DriftChangepoints,
+    ChangepointAlarmsResponse,
+    PopulationQuantiles,
+    DriftPercentile,
 )
 
+# -------------------------
+# Dataset (loaded in the background)
+# -------------------------
+BASE_DIR = Path(__file__).resolve().parents[2]
+DATA_DIR = Path(os.environ.get("BDO_DATA_DIR", BASE_DIR / "data"))
+
+# Seconds between checks for a newer dataset on disk (0 disables watching)
+RELOAD_SECONDS = float(os.environ.get("BDO_RELOAD_SECONDS", 30))
+
+# Required in the X-Admin-Token header of admin calls; admin routes are
+# disabled (404) when it is not set
+ADMIN_TOKEN = os.environ.get("BDO_ADMIN_TOKEN")
+
+logger = logging.getLogger(__name__)
+
+# Per-user indexes keep pandas out of the request path. The first snapshot
+# is built after the server starts listening; later snapshots replace it
+# atomically when the pipeline publishes new data.
+dataset = Dataset(DATA_DIR, RELOAD_SECONDS)
+
+
+def current_snapshot():
+    """Snapshot for this request; 503 until the first load has finished"""
+    snapshot = dataset.snapshot()
+    if snapshot is None:
+        raise HTTPException(status_code=503, detail="Dataset is loading")
+    return snapshot
+
+
+@asynccontextmanager
+async def lifespan(app):
+    dataset.start()
+    yield
+    dataset.stop()
+
 # -------------------------
 # App init
 # -------------------------
@@ -16,91 +82,616 @@ app = FastAPI(
     title="Behavior Drift Observatory",
     description="Unsupervised behavioral drift monitoring system",
     version="1.0",
+    lifespan=lifespan,
 )
 
 # -------------------------
-# Load data once (startup)
+# Health check (readiness)
 # -------------------------
-BASE_DIR = Path(__file__).resolve().parents[2]
+@app.get("/health")
+def health():
+    snapshot = dataset.snapshot()
+    if snapshot is None:
+        return FastJSONResponse(
+            {"status": "loading", "ready": False, "reload_failed": dataset.reload_failed},
+            status_code=503,
+        )
+    return {
+        "status": "ok",
+        "ready": True,
+        "dataset_version": snapshot.version,
+        "reload_failed": dataset.reload_failed,
+    }
 
-DRIFT_PATH = BASE_DIR / "data" / "drift_scores.csv"
-EXPLAIN_PATH = BASE_DIR / "data" / "drift_explanations.csv"
+# -------------------------
+# Admin: reload dataset
+# -------------------------
+@app.post("/admin/reload")
+def reload_dataset(force: bool = False, x_admin_token: str = Header(None)):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not hmac.compare_digest(x_admin_token or "", ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
 
-drift_df = pd.read_csv(DRIFT_PATH)
-explain_df = pd.read_csv(EXPLAIN_PATH)
+    try:
+        reloaded = dataset.reload(force=force)
+    except Exception:
+        # Details stay in the server log, not in the response
+        logger.exception("Dataset reload failed")
+        raise HTTPException(status_code=500, detail="Reload failed")
+
+    snapshot = dataset.snapshot()
+    return {
+        "reloaded": reloaded,
+        "dataset_version": snapshot.version if snapshot else None,
+    }
 
 # -------------------------
-# Health check
+# Metrics (Prometheus text format)
 # -------------------------
-@app.get("/health")
-def health():
-    return {"status": "ok"}
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(
+        render_metrics(), media_type="text/plain; version=0.0.4"
+    )
 
 # -------------------------
 # Full drift timeline
 # -------------------------
-@app.get("/drift/score/{user_id}", response_model=DriftTimeline)
-def get_drift_timeline(user_id: str):
-    df = drift_df[drift_df["user_id"] == user_id]
+# Responses are encoded straight from index arrays (see responses.py).
+# format=columnar returns {"days": [...], "scores": [...]}, which skips
+# building one object per point.
+SCORE_LOOKUP, SCORE_SERIALIZE = route_timers("/drift/score/{user_id}")
 
-    if df.empty:
+@app.get(
+    "/drift/score/{user_id}",
+    response_model=Union[DriftTimeline, CompactTimeline],
+)
+def get_drift_timeline(
+    user_id: str,
+    fmt: TimelineFormat = Query("rows", alias="format"),
+):
+    snapshot = current_snapshot()
+    start = time.perf_counter()
+    found = snapshot.drift_index.timeline(user_id)
+    lookup_done = time.perf_counter()
+    SCORE_LOOKUP.observe(lookup_done - start)
+
+    if found is None:
         raise HTTPException(status_code=404, detail="User not found")
 
-    timeline = [
-        DriftPoint(day=int(row.day), drift_score=float(row.drift_score))
-        for row in df.itertuples()
-    ]
+    days, scores = found
+    if fmt == "columnar":
+        content = {"user_id": user_id, "days": days, "scores": as_json_floats(scores)}
+    else:
+        content = {
+            "user_id": user_id,
+            "timeline": [
+                {"day": day, "drift_score": score}
+                for day, score in zip(days.tolist(), scores.tolist())
+            ],
+        }
+
+    response = FastJSONResponse(content)
+    SCORE_SERIALIZE.observe(time.perf_counter() - lookup_done)
 
-    return DriftTimeline(user_id=user_id, timeline=timeline)
+    return response
 
 # -------------------------
 # Latest drift score
 # -------------------------
-@app.get("/drift/latest/{user_id}")
+LATEST_LOOKUP, LATEST_SERIALIZE = route_timers("/drift/latest/{user_id}")
+
+@app.get("/drift/latest/{user_id}", response_model=LatestDrift)
 def get_latest_drift(user_id: str):
-    df = drift_df[drift_df["user_id"] == user_id]
+    snapshot = current_snapshot()
+    start = time.perf_counter()
+    latest = snapshot.drift_index.latest(user_id)
+    lookup_done = time.perf_counter()
+    LATEST_LOOKUP.observe(lookup_done - start)
 
-    if df.empty:
+    if latest is None:
         raise HTTPException(status_code=404, detail="User not found")
 
-    latest = df.sort_values("day").iloc[-1]
+    day, score = latest
 
-    return {
+    response = FastJSONResponse({
         "user_id": user_id,
-        "day": int(latest.day),
-        "drift_score": float(latest.drift_score),
+        "day": day,
+        "drift_score": score,
+    })
+    LATEST_SERIALIZE.observe(time.perf_counter() - lookup_done)
+
+    return response
+
+# -------------------------
+# Drift onset
+# -------------------------
+# First day of sustained drift, precomputed by the scoring stage
+ONSET_LOOKUP, ONSET_SERIALIZE = route_timers("/drift/onset/{user_id}")
+
+@app.get("/drift/onset/{user_id}", response_model=DriftOnset)
+def get_drift_onset(user_id: str):
+    snapshot = current_snapshot()
+    start = time.perf_counter()
+    onset_day = snapshot.onset_index.onset(user_id)
+    lookup_done = time.perf_counter()
+    ONSET_LOOKUP.observe(lookup_done - start)
+
+    if onset_day is None:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    response = FastJSONResponse({
+        "user_id": user_id,
+        "onset_day": onset_day if onset_day >= 0 else None,
+    })
+    ONSET_SERIALIZE.observe(time.perf_counter() - lookup_done)
+
+    return response
+
+# -------------------------
+# Change-point detectors
+# -------------------------
+# CUSUM / Page-Hinkley statistics and alarm days, advanced one day at a time
+# by the change-point stage (detect_changepoints.py / update_daily.py)
+CHANGEPOINT_LOOKUP, CHANGEPOINT_SERIALIZE = route_timers("/drift/changepoint/{user_id}")
+
+def detector_content(statistic, alarm_day, last_alarm_day, alarms):
+    return {
+        "statistic": statistic,
+        "alarm_day": alarm_day if alarm_day >= 0 else None,
+        "last_alarm_day": last_alarm_day if last_alarm_day >= 0 else None,
+        "alarms": alarms,
     }
 
+
+@app.get("/drift/changepoint/{user_id}", response_model=DriftChangepoints)
+def get_drift_changepoints(user_id: str):
+    snapshot = current_snapshot()
+    start = time.perf_counter()
+    found = snapshot.changepoint_index.state(user_id)
+    lookup_done = time.perf_counter()
+    CHANGEPOINT_LOOKUP.observe(lookup_done - start)
+
+    if found is None:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    last_day, detectors = found
+    content = {"user_id": user_id, "last_day": last_day}
+    for name, values in detectors.items():
+        content[name] = detector_content(*values)
+
+    response = FastJSONResponse(content)
+    CHANGEPOINT_SERIALIZE.observe(time.perf_counter() - lookup_done)
+
+    return response
+
+
+ALARMS_LOOKUP, ALARMS_SERIALIZE = route_timers("/drift/alarms")
+
+@app.get("/drift/alarms", response_model=ChangepointAlarmsResponse)
+def get_drift_alarms(
+    detector: ChangepointDetector = "cusum",
+    since_day: int = Query(0, ge=0),
+    limit: int = Query(1000, ge=1, le=MAX_LEADERBOARD_K),
+):
+    changepoint_index = current_snapshot().changepoint_index
+    start = time.perf_counter()
+    total, positions = changepoint_index.alarmed_since(detector, since_day, limit)
+    users, statistics, alarm_days, last_alarm_days, alarms = (
+        changepoint_index.rows(detector, positions)
+    )
+    lookup_done = time.perf_counter()
+    ALARMS_LOOKUP.observe(lookup_done - start)
+
+    # Most recent alarm first
+    results = [
+        {"user_id": user_id, **detector_content(*values)}
+        for user_id, *values in zip(
+            users.tolist(),
+            statistics.tolist(),
+            alarm_days.tolist(),
+            last_alarm_days.tolist(),
+            alarms.tolist(),
+        )
+    ]
+
+    response = FastJSONResponse({
+        "detector": detector,
+        "since_day": since_day,
+        "total": total,
+        "results": results,
+    })
+    ALARMS_SERIALIZE.observe(time.perf_counter() - lookup_done)
+
+    return response
+
 # -------------------------
 # Drift explanation
 # -------------------------
+EXPLAIN_LOOKUP, EXPLAIN_SERIALIZE = route_timers("/drift/explanation/{user_id}")
+
+def explanation_content(user_id, strongest):
+    day, features, contributions, directions = strongest
+    return {
+        "user_id": user_id,
+        "day": day,
+        "explanations": [
+            {"feature": f, "contribution": c, "direction": d}
+            for f, c, d in zip(
+                features.tolist(), contributions.tolist(), directions.tolist()
+            )
+        ],
+    }
+
+
 @app.get("/drift/explanation/{user_id}", response_model=DriftExplanationResponse)
 def get_drift_explanation(user_id: str):
-    user_explain = explain_df[explain_df["user_id"] == user_id]
+    snapshot = current_snapshot()
+    start = time.perf_counter()
+    strongest = snapshot.explain_index.strongest(user_id)
+    lookup_done = time.perf_counter()
+    EXPLAIN_LOOKUP.observe(lookup_done - start)
 
-    if user_explain.empty:
+    if strongest is None:
         raise HTTPException(status_code=404, detail="User not found")
 
-    # Pick day with strongest total drift
-    strongest_day = (
-        user_explain.groupby("day")["contribution"]
-        .apply(lambda x: x.abs().sum())
-        .idxmax()
+    # Day with strongest total drift is precomputed at startup
+    response = FastJSONResponse(explanation_content(user_id, strongest))
+    EXPLAIN_SERIALIZE.observe(time.perf_counter() - lookup_done)
+
+    return response
+
+# -------------------------
+# Dashboard summary
+# -------------------------
+# Timeline, onset, latest score and strongest explanation in one round trip.
+# The dataset version lets clients key their caches on the loaded data.
+SUMMARY_LOOKUP, SUMMARY_SERIALIZE = route_timers("/drift/summary/{user_id}")
+
+@app.get("/drift/summary/{user_id}", response_model=DriftSummary)
+def get_drift_summary(user_id: str):
+    snapshot = current_snapshot()
+    start = time.perf_counter()
+    found = snapshot.drift_index.timeline(user_id)
+    if found is None:
+        SUMMARY_LOOKUP.observe(time.perf_counter() - start)
+        raise HTTPException(status_code=404, detail="User not found")
+
+    days, scores = found
+    onset_day = snapshot.onset_index.onset(user_id)
+    strongest = snapshot.explain_index.strongest(user_id)
+    lookup_done = time.perf_counter()
+    SUMMARY_LOOKUP.observe(lookup_done - start)
+
+    timeline = [
+        {"day": day, "drift_score": score}
+        for day, score in zip(days.tolist(), scores.tolist())
+    ]
+
+    explanation = None
+    if strongest is not None:
+        explanation = explanation_content(user_id, strongest)
+
+    response = FastJSONResponse({
+        "user_id": user_id,
+        "dataset_version": snapshot.version,
+        "timeline": timeline,
+        "onset_day": onset_day if onset_day >= 0 else None,
+        "latest": timeline[-1],
+        "explanation": explanation,
+    })
+    SUMMARY_SERIALIZE.observe(time.perf_counter() - lookup_done)
+
+    return response
+
+# -------------------------
+# Bulk queries
+# -------------------------
+# Each bulk call resolves all user ids with one vectorized search and
+# gathers every requested row in one indexing operation. Results follow
+# request order; unknown ids are listed under "missing". Payloads are built
+# from typed index arrays, so they are encoded directly instead of being
+# validated a second time against the response model.
+def split_found(user_ids, positions):
+    found = positions >= 0
+    user_ids = np.asarray(user_ids, dtype=object)
+    return found, user_ids[found].tolist(), user_ids[~found].tolist()
+
+
+BULK_LATEST_LOOKUP, BULK_LATEST_SERIALIZE = route_timers("/drift/bulk/latest")
+
+@app.post("/drift/bulk/latest", response_model=BulkLatestResponse)
+def get_latest_drift_bulk(request: BulkRequest):
+    drift_index = current_snapshot().drift_index
+    start = time.perf_counter()
+    positions = drift_index.resolve(request.user_ids)
+    found, found_ids, missing = split_found(request.user_ids, positions)
+    days, scores = drift_index.latest_many(positions[found])
+    lookup_done = time.perf_counter()
+    BULK_LATEST_LOOKUP.observe(lookup_done - start)
+
+    results = [
+        {"user_id": user_id, "day": day, "drift_score": score}
+        for user_id, day, score in zip(found_ids, days.tolist(), scores.tolist())
+    ]
+
+    response = FastJSONResponse({"results": results, "missing": missing})
+    BULK_LATEST_SERIALIZE.observe(time.perf_counter() - lookup_done)
+
+    return response
+
+
+BULK_SCORE_LOOKUP, BULK_SCORE_SERIALIZE = route_timers("/drift/bulk/score")
+
+@app.post(
+    "/drift/bulk/score",
+    response_model=Union[BulkTimelineResponse, BulkCompactTimelineResponse],
+)
+def get_drift_timeline_bulk(
+    request: BulkRequest,
+    fmt: TimelineFormat = Query("rows", alias="format"),
+):
+    drift_index = current_snapshot().drift_index
+    start = time.perf_counter()
+    positions = drift_index.resolve(request.user_ids)
+    found, found_ids, missing = split_found(request.user_ids, positions)
+    lengths, days, scores = drift_index.timelines_many(positions[found])
+    lookup_done = time.perf_counter()
+    BULK_SCORE_LOOKUP.observe(lookup_done - start)
+
+    bounds = np.r_[0, np.cumsum(lengths)].tolist()
+
+    if fmt == "columnar":
+        scores = as_json_floats(scores)
+        results = [
+            {"user_id": user_id, "days": days[lo:hi], "scores": scores[lo:hi]}
+            for user_id, lo, hi in zip(found_ids, bounds[:-1], bounds[1:])
+        ]
+        response = FastJSONResponse({"results": results, "missing": missing})
+        BULK_SCORE_SERIALIZE.observe(time.perf_counter() - lookup_done)
+        return response
+
+    days, scores = days.tolist(), scores.tolist()
+    results = [
+        {
+            "user_id": user_id,
+            "timeline": [
+                {"day": day, "drift_score": score}
+                for day, score in zip(days[lo:hi], scores[lo:hi])
+            ],
+        }
+        for user_id, lo, hi in zip(found_ids, bounds[:-1], bounds[1:])
+    ]
+
+    response = FastJSONResponse({"results": results, "missing": missing})
+    BULK_SCORE_SERIALIZE.observe(time.perf_counter() - lookup_done)
+
+    return response
+
+
+BULK_EXPLAIN_LOOKUP, BULK_EXPLAIN_SERIALIZE = route_timers("/drift/bulk/explanation")
+
+@app.post("/drift/bulk/explanation", response_model=BulkExplanationResponse)
+def get_drift_explanation_bulk(request: BulkRequest):
+    explain_index = current_snapshot().explain_index
+    start = time.perf_counter()
+    positions = explain_index.resolve(request.user_ids)
+    found, found_ids, missing = split_found(request.user_ids, positions)
+    days, lengths, features, contributions, directions = (
+        explain_index.strongest_many(positions[found])
     )
+    lookup_done = time.perf_counter()
+    BULK_EXPLAIN_LOOKUP.observe(lookup_done - start)
 
-    day_df = user_explain[user_explain["day"] == strongest_day]
+    features, contributions, directions = (
+        features.tolist(), contributions.tolist(), directions.tolist()
+    )
+    bounds = np.r_[0, np.cumsum(lengths)].tolist()
 
-    explanations = [
-        DriftExplanation(
-            feature=row.feature,
-            contribution=float(row.contribution),
-            direction=row.direction,
+    results = [
+        {
+            "user_id": user_id,
+            "day": day,
+            "explanations": [
+                {"feature": f, "contribution": c, "direction": d}
+                for f, c, d in zip(
+                    features[lo:hi], contributions[lo:hi], directions[lo:hi]
+                )
+            ],
+        }
+        for user_id, day, lo, hi in zip(
+            found_ids, days.tolist(), bounds[:-1], bounds[1:]
+        )
+    ]
+
+    response = FastJSONResponse({"results": results, "missing": missing})
+    BULK_EXPLAIN_SERIALIZE.observe(time.perf_counter() - lookup_done)
+
+    return response
+
+# -------------------------
+# Leaderboard queries
+# -------------------------
+# Per-user max / mean / std / latest scores are precomputed by the scoring
+# stage and kept sorted per statistic: top-K and bottom-K are slices of the
+# rank order, a score range is two binary searches plus a slice.
+def leaderboard_entries(leaderboard, positions):
+    users, stats, latest_days = leaderboard.rows(positions)
+    columns = [stats[:, j].tolist() for j in range(len(LEADERBOARD_STATS))]
+    return [
+        {
+            "user_id": user_id,
+            "max_score": max_score,
+            "mean_score": mean_score,
+            "std_score": std_score,
+            "latest_score": latest_score,
+            "latest_day": latest_day,
+        }
+        for user_id, max_score, mean_score, std_score, latest_score, latest_day in zip(
+            users.tolist(), *columns, latest_days.tolist()
         )
-        for row in day_df.itertuples()
     ]
 
-    return DriftExplanationResponse(
-        user_id=user_id,
-        day=int(strongest_day),
-        explanations=explanations,
+
+TOP_LOOKUP, TOP_SERIALIZE = route_timers("/drift/top")
+
+@app.get("/drift/top", response_model=LeaderboardResponse)
+def get_top_drift(
+    k: int = Query(10, ge=1, le=MAX_LEADERBOARD_K),
+    stat: LeaderboardStat = "max",
+):
+    leaderboard = current_snapshot().leaderboard
+    start = time.perf_counter()
+    positions = leaderboard.top(stat, k)
+    lookup_done = time.perf_counter()
+    TOP_LOOKUP.observe(lookup_done - start)
+
+    response = FastJSONResponse(
+        {"stat": stat, "results": leaderboard_entries(leaderboard, positions)}
+    )
+    TOP_SERIALIZE.observe(time.perf_counter() - lookup_done)
+
+    return response
+
+
+BOTTOM_LOOKUP, BOTTOM_SERIALIZE = route_timers("/drift/bottom")
+
+@app.get("/drift/bottom", response_model=LeaderboardResponse)
+def get_bottom_drift(
+    k: int = Query(10, ge=1, le=MAX_LEADERBOARD_K),
+    stat: LeaderboardStat = "mean",
+):
+    leaderboard = current_snapshot().leaderboard
+    start = time.perf_counter()
+    positions = leaderboard.bottom(stat, k)
+    lookup_done = time.perf_counter()
+    BOTTOM_LOOKUP.observe(lookup_done - start)
+
+    response = FastJSONResponse(
+        {"stat": stat, "results": leaderboard_entries(leaderboard, positions)}
     )
+    BOTTOM_SERIALIZE.observe(time.perf_counter() - lookup_done)
+
+    return response
+
+
+RANGE_LOOKUP, RANGE_SERIALIZE = route_timers("/drift/range")
+
+@app.get("/drift/range", response_model=LeaderboardRangeResponse)
+def get_drift_range(
+    min_score: float = Query(...),
+    max_score: float = Query(float("inf")),
+    stat: LeaderboardStat = "latest",
+    limit: int = Query(1000, ge=1, le=MAX_LEADERBOARD_K),
+):
+    leaderboard = current_snapshot().leaderboard
+    start = time.perf_counter()
+    lo, hi = leaderboard.range_bounds(stat, min_score, max_score)
+    positions = leaderboard.between(stat, min_score, max_score, limit)
+    lookup_done = time.perf_counter()
+    RANGE_LOOKUP.observe(lookup_done - start)
+
+    response = FastJSONResponse({
+        "stat": stat,
+        "total": hi - lo,
+        "results": leaderboard_entries(leaderboard, positions),
+    })
+    RANGE_SERIALIZE.observe(time.perf_counter() - lookup_done)
+
+    return response
+
+# -------------------------
+# Population percentiles
+# -------------------------
+# Answered from per-(metric, day, cohort) t-digests written by the pipeline
+# (engine.sketch); without a cohort, the day's cohort sketches are merged.
+DEFAULT_QUANTILES = [0.5, 0.9, 0.99]
+
+QUANTILES_LOOKUP, QUANTILES_SERIALIZE = route_timers("/population/quantiles")
+
+@app.get("/population/quantiles", response_model=PopulationQuantiles)
+def get_population_quantiles(
+    metric: str = SCORE_METRIC,
+    day: Optional[int] = None,
+    cohort: Optional[int] = None,
+    q: List[float] = Query(DEFAULT_QUANTILES),
+):
+    if any(not 0 <= value <= 1 for value in q):
+        raise HTTPException(status_code=422, detail="Quantiles must be between 0 and 1")
+
+    sketches = current_snapshot().sketches
+    start = time.perf_counter()
+    if day is None:
+        day = sketches.latest_day(metric)
+    values = None if day is None else sketches.quantiles(metric, day, q, cohort)
+    count = sketches.count(metric, day, cohort) if values is not None else 0.0
+    lookup_done = time.perf_counter()
+    QUANTILES_LOOKUP.observe(lookup_done - start)
+
+    if values is None:
+        raise HTTPException(status_code=404, detail="No population sketch")
+
+    response = FastJSONResponse({
+        "metric": metric,
+        "day": day,
+        "cohort": cohort,
+        "count": count,
+        "quantiles": [
+            {"q": quantile, "value": value}
+            for quantile, value in zip(q, values.tolist())
+        ],
+    })
+    QUANTILES_SERIALIZE.observe(time.perf_counter() - lookup_done)
+
+    return response
+
+
+PERCENTILE_LOOKUP, PERCENTILE_SERIALIZE = route_timers("/population/percentile/{user_id}")
+
+@app.get("/population/percentile/{user_id}", response_model=DriftPercentile)
+def get_drift_percentile(
+    user_id: str,
+    day: Optional[int] = None,
+    cohort: Optional[int] = None,
+):
+    snapshot = current_snapshot()
+    start = time.perf_counter()
+    found = snapshot.drift_index.timeline(user_id)
+    if found is None:
+        PERCENTILE_LOOKUP.observe(time.perf_counter() - start)
+        raise HTTPException(status_code=404, detail="User not found")
+
+    # The user's score on `day` (latest scored day by default)
+    days, scores = found
+    i = len(days) - 1 if day is None else int(np.searchsorted(days, day))
+    if i >= len(days) or (day is not None and days[i] != day):
+        PERCENTILE_LOOKUP.observe(time.perf_counter() - start)
+        raise HTTPException(status_code=404, detail="No drift score for this day")
+
+    day, score = int(days[i]), float(scores[i])
+    ranks = snapshot.sketches.ranks(SCORE_METRIC, day, [score], cohort)
+    count = snapshot.sketches.count(SCORE_METRIC, day, cohort)
+    lookup_done = time.perf_counter()
+    PERCENTILE_LOOKUP.observe(lookup_done - start)
+
+    if ranks is None:
+        raise HTTPException(status_code=404, detail="No population sketch")
+
+    response = FastJSONResponse({
+        "user_id": user_id,
+        "day": day,
+        "drift_score": score,
+        "cohort": cohort,
+        "count": count,
+        "percentile": float(ranks[0]) * 100,
+    })
+    PERCENTILE_SERIALIZE.observe(time.perf_counter() - lookup_done)
+
+    return response
+
+# -------------------------
+# Request metrics
+# -------------------------
+# Outermost wrapper, bound to every route template registered above
+app.add_middleware(MetricsMiddleware, routes=[route.path for route in app.routes])
@@ -0,0 +1,76 @@
+import json
+
+import numpy as np
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# -------------------------
+# Fast JSON responses
+# -------------------------
+def _default(value):
+    """NumPy values for the stdlib encoder"""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _orjson_default(value):
+    """
+    Arrays orjson won't take natively: memmap views become plain contiguous
+    arrays; object and other arrays fall back to lists.
+    """
+    if type(value) is np.memmap and value.dtype != object:
+        return np.ascontiguousarray(value)
+    return _default(value)
+
+
+def dumps(content):
+    """
+    JSON bytes for plain Python / NumPy content.
+
+    orjson (when installed) writes NumPy arrays directly from their buffers;
+    otherwise the stdlib encoder is used with the same compact output.
+    """
+    if orjson is not None:
+        return orjson.dumps(
+            content, option=orjson.OPT_SERIALIZE_NUMPY, default=_orjson_default
+        )
+
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+        default=_default,
+    ).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """
+    JSON response encoded straight from dicts and arrays.
+
+    Skips response-model validation; handlers only pass content that
+    already matches the declared schema.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content):
+        return dumps(content)
+
+
+def as_json_floats(values):
+    """
+    float64 view of score arrays before encoding.
+
+    Store arrays are float32; widening keeps the numbers identical to the
+    `.tolist()` floats served before, instead of float32's shortest repr.
+    """
+    return np.asarray(values, dtype=np.float64)
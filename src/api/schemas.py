@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
 
 
 class DriftPoint(BaseModel):
@@ -12,6 +12,16 @@ class DriftTimeline(BaseModel):
     timeline: List[DriftPoint]
 
 
+# Compact alternative to DriftTimeline (?format=columnar)
+TimelineFormat = Literal["rows", "columnar"]
+
+
+class CompactTimeline(BaseModel):
+    user_id: str
+    days: List[int]
+    scores: List[float]
+
+
 class DriftExplanation(BaseModel):
     feature: str
     contribution: float
@@ -22,3 +32,138 @@ class DriftExplanationResponse(BaseModel):
     user_id: str
     day: int
     explanations: List[DriftExplanation]
+
+
+class DriftOnset(BaseModel):
+    user_id: str
+    onset_day: Optional[int]
+
+
+class LatestDrift(BaseModel):
+    user_id: str
+    day: int
+    drift_score: float
+
+
+class DriftSummary(BaseModel):
+    """Everything the dashboard shows for one user, in one payload"""
+    user_id: str
+    dataset_version: str
+    timeline: List[DriftPoint]
+    onset_day: Optional[int]
+    latest: DriftPoint
+    explanation: Optional[DriftExplanationResponse]
+
+
+# -------------------------
+# Bulk queries
+# -------------------------
+MAX_BULK_USERS = 50_000
+
+
+class BulkRequest(BaseModel):
+    user_ids: List[str] = Field(..., max_length=MAX_BULK_USERS)
+
+
+class BulkLatestResponse(BaseModel):
+    results: List[LatestDrift]
+    missing: List[str]
+
+
+class BulkTimelineResponse(BaseModel):
+    results: List[DriftTimeline]
+    missing: List[str]
+
+
+class BulkCompactTimelineResponse(BaseModel):
+    results: List[CompactTimeline]
+    missing: List[str]
+
+
+class BulkExplanationResponse(BaseModel):
+    results: List[DriftExplanationResponse]
+    missing: List[str]
+
+
+# -------------------------
+# Leaderboard queries
+# -------------------------
+MAX_LEADERBOARD_K = 10_000
+
+LeaderboardStat = Literal["max", "mean", "std", "latest"]
+
+
+class LeaderboardEntry(BaseModel):
+    user_id: str
+    max_score: float
+    mean_score: float
+    std_score: float
+    latest_score: float
+    latest_day: int
+
+
+class LeaderboardResponse(BaseModel):
+    stat: LeaderboardStat
+    results: List[LeaderboardEntry]
+
+
+class LeaderboardRangeResponse(BaseModel):
+    stat: LeaderboardStat
+    total: int
+    results: List[LeaderboardEntry]
+
+
+# -------------------------
+# Change-point detectors
+# -------------------------
+ChangepointDetector = Literal["cusum", "page_hinkley"]
+
+
+class DetectorState(BaseModel):
+    statistic: float
+    alarm_day: Optional[int]
+    last_alarm_day: Optional[int]
+    alarms: int
+
+
+class DriftChangepoints(BaseModel):
+    user_id: str
+    last_day: int
+    cusum: DetectorState
+    page_hinkley: DetectorState
+
+
+class ChangepointAlarm(DetectorState):
+    user_id: str
+
+
+class ChangepointAlarmsResponse(BaseModel):
+    detector: ChangepointDetector
+    since_day: int
+    total: int
+    results: List[ChangepointAlarm]
+
+
+# -------------------------
+# Population percentiles
+# -------------------------
+class QuantileValue(BaseModel):
+    q: float
+    value: float
+
+
+class PopulationQuantiles(BaseModel):
+    metric: str
+    day: int
+    cohort: Optional[int]
+    count: float
+    quantiles: List[QuantileValue]
+
+
+class DriftPercentile(BaseModel):
+    user_id: str
+    day: int
+    drift_score: float
+    cohort: Optional[int]
+    count: float
+    percentile: float
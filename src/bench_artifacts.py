@@ -0,0 +1,62 @@
+import tempfile
+import time
+from pathlib import Path
+
+from engine.artifacts import (
+    artifact_exists,
+    artifact_path,
+    available_formats,
+    read_artifact,
+    write_artifact,
+)
+
+# -----------------------------
+# Configuration
+# -----------------------------
+ARTIFACTS = [
+    "data/synthetic_behavior",
+    "data/behavior_representations",
+    "data/drift_scores",
+    "data/drift_explanations",
+]
+
+REPEATS = 3
+
+
+def best_time(fn, repeats):
+    best = float("inf")
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+# -----------------------------
+# Run benchmark
+# -----------------------------
+formats = available_formats()
+print(f"Formats: {', '.join(formats)}\n")
+print(f"{'artifact':<26}{'format':<9}{'size (MB)':>11}{'write (s)':>11}{'read (s)':>10}")
+
+with tempfile.TemporaryDirectory() as tmp:
+    for stem in ARTIFACTS:
+        if not artifact_exists(stem):
+            print(f"{Path(stem).name:<26}missing, skipped")
+            continue
+
+        df = read_artifact(stem)
+        out_stem = Path(tmp) / Path(stem).name
+
+        for fmt in formats:
+            write_time, path = best_time(lambda: write_artifact(df, out_stem, fmt), REPEATS)
+            read_time, loaded = best_time(lambda: read_artifact(out_stem, fmt), REPEATS)
+
+            assert loaded.shape == df.shape, f"{fmt} round trip changed shape"
+            size_mb = artifact_path(out_stem, fmt).stat().st_size / 1e6
+
+            print(
+                f"{Path(stem).name:<26}{fmt:<9}{size_mb:>11.2f}"
+                f"{write_time:>11.3f}{read_time:>10.3f}"
+            )
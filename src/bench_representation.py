@@ -0,0 +1,123 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from engine.artifacts import artifact_exists, read_artifact
+from engine.keys import decode_keys
+from engine.representation import build_representations
+
+# -----------------------------
+# Configuration
+# -----------------------------
+DATA_PATH = "data/synthetic_behavior"
+
+WINDOW_SIZE = 14  # window checked against the per-row loop
+REPEATS = 3
+
+STATISTICS = ["mean", "std", "min", "max"]
+WINDOW_SPECS = [(window, STATISTICS) for window in (7, 14, 30)]
+
+# Prefix-sum windows are not summed in the loop's order; agreement is
+# checked to a relative tolerance instead of bit for bit
+RTOL = 1e-9
+
+FEATURE_COLUMNS = [
+    "session_count",
+    "avg_session_duration",
+    "active_hours_entropy",
+    "action_type_entropy",
+    "inter_day_variability"
+]
+
+assert artifact_exists(DATA_PATH), "Missing synthetic_behavior artifact (run generate_data.py)"
+
+
+# -----------------------------
+# Reference implementation (per-user, per-day loop)
+# -----------------------------
+def legacy_build(df):
+    df = df.sort_values(by=["user_id", "day"]).reset_index(drop=True)
+    representation_rows = []
+
+    for user_id, user_df in df.groupby("user_id"):
+        user_df = user_df.reset_index(drop=True)
+
+        for current_day in range(WINDOW_SIZE - 1, len(user_df)):
+            window_df = user_df.iloc[current_day - WINDOW_SIZE + 1 : current_day + 1]
+
+            rep = {
+                "user_id": user_id,
+                "day": int(user_df.loc[current_day, "day"])
+            }
+
+            for feature in FEATURE_COLUMNS:
+                rep[f"{feature}_mean_{WINDOW_SIZE}d"] = window_df[feature].mean()
+                rep[f"{feature}_std_{WINDOW_SIZE}d"] = window_df[feature].std()
+                rep[f"{feature}_min_{WINDOW_SIZE}d"] = window_df[feature].min()
+                rep[f"{feature}_max_{WINDOW_SIZE}d"] = window_df[feature].max()
+
+            representation_rows.append(rep)
+
+    return pd.DataFrame(representation_rows)
+
+
+def vectorized_build(df):
+    return build_representations(df, FEATURE_COLUMNS, [(WINDOW_SIZE, STATISTICS)])
+
+
+def shared_build(df):
+    """Every window spec in one pass over shared accumulators"""
+    return build_representations(df, FEATURE_COLUMNS, WINDOW_SPECS)
+
+
+def separate_builds(df):
+    """One build per window spec, as running the stage once per window"""
+    return [build_representations(df, FEATURE_COLUMNS, [spec]) for spec in WINDOW_SPECS]
+
+
+def best_time(fn, df, repeats):
+    best = float("inf")
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn(df)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+# -----------------------------
+# Run benchmark
+# -----------------------------
+df = read_artifact(DATA_PATH)
+print(f"Input rows: {len(df)} ({df['user_id'].nunique()} users)")
+
+legacy_time, legacy_df = best_time(legacy_build, df, 1)
+fast_time, fast_df = best_time(vectorized_build, df, REPEATS)
+shared_time, shared_df = best_time(shared_build, df, REPEATS)
+separate_time, _ = best_time(separate_builds, df, REPEATS)
+
+pd.testing.assert_frame_equal(
+    legacy_df,
+    decode_keys(fast_df)[legacy_df.columns],
+    check_dtype=False,
+    check_exact=False,
+    rtol=RTOL,
+    atol=0,
+)
+checked = [c for c in legacy_df.columns if c not in ("user_id", "day")]
+shared_rows = shared_df.loc[shared_df[checked].notna().all(axis=1), checked]
+np.testing.assert_allclose(shared_rows.to_numpy(), legacy_df[checked].to_numpy(), rtol=RTOL)
+print(f"✔ Outputs match the loop (rtol {RTOL:g})")
+
+print(f"\n{'engine':<24}{'seconds':>10}{'rows/sec':>16}")
+for name, elapsed in [
+    (f"loop ({WINDOW_SIZE}d)", legacy_time),
+    (f"vectorized ({WINDOW_SIZE}d)", fast_time),
+    (f"shared ({len(WINDOW_SPECS)} windows)", shared_time),
+    (f"separate ({len(WINDOW_SPECS)} windows)", separate_time),
+]:
+    print(f"{name:<24}{elapsed:>10.3f}{len(df) / elapsed:>16,.0f}")
+
+print(f"\nSpeedup over loop: {legacy_time / fast_time:.1f}x")
+print(f"Shared accumulators vs one build per window: {separate_time / shared_time:.2f}x")
@@ -1,13 +1,21 @@
-import pandas as pd
-import numpy as np
+import time
+
+from engine.artifacts import read_artifact, write_artifact
+from engine.metrics import write_stage_metrics
+from engine.representation import build_representations
 
 # -----------------------------
 # Configuration
 # -----------------------------
-DATA_PATH = "data/synthetic_behavior.csv"
-OUTPUT_PATH = "data/behavior_representations.csv"
+# Artifact stems; the file format is resolved by engine.artifacts
+DATA_PATH = "data/synthetic_behavior"
+OUTPUT_PATH = "data/behavior_representations"
 
-WINDOW_SIZE = 14
+# Trailing windows (days) and the statistics computed over each; all of
+# them share one set of accumulators
+WINDOW_SIZES = [7, 14, 30]
+WINDOW_STATISTICS = ["mean", "std", "min", "max"]
+WINDOW_SPECS = [(window, WINDOW_STATISTICS) for window in WINDOW_SIZES]
 
 FEATURE_COLUMNS = [
     "session_count",
@@ -20,40 +28,27 @@ FEATURE_COLUMNS = [
 # -----------------------------
 # Load data
 # -----------------------------
-df = pd.read_csv(DATA_PATH)
-
-# Ensure correct ordering
-df = df.sort_values(by=["user_id", "day"]).reset_index(drop=True)
+start = time.perf_counter()
+df = read_artifact(DATA_PATH)
 
 # -----------------------------
 # Build rolling representations
 # -----------------------------
-representation_rows = []
-
-for user_id, user_df in df.groupby("user_id"):
-    user_df = user_df.reset_index(drop=True)
-
-    for current_day in range(WINDOW_SIZE - 1, len(user_df)):
-        window_df = user_df.iloc[current_day - WINDOW_SIZE + 1 : current_day + 1]
-
-        rep = {
-            "user_id": user_id,
-            "day": int(user_df.loc[current_day, "day"])
-        }
-
-        # Compute window means
-        for feature in FEATURE_COLUMNS:
-            rep[f"{feature}_mean_{WINDOW_SIZE}d"] = window_df[feature].mean()
-
-        representation_rows.append(rep)
+# All users, days and windows are aggregated in one vectorized pass
+rep_df = build_representations(df, FEATURE_COLUMNS, WINDOW_SPECS)
 
 # -----------------------------
 # Save representations
 # -----------------------------
-rep_df = pd.DataFrame(representation_rows)
-rep_df.to_csv(OUTPUT_PATH, index=False)
+output_file = write_artifact(rep_df, OUTPUT_PATH)
+
+write_stage_metrics(
+    "representation",
+    time.perf_counter() - start,
+    {"synthetic_behavior": len(df), "behavior_representations": len(rep_df)},
+)
 
 print(
     f"Behavior representations generated: {rep_df.shape}\n"
-    f"Saved to: {OUTPUT_PATH}"
+    f"Saved to: {output_file}"
 )
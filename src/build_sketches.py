@@ -0,0 +1,60 @@
+import time
+
+from engine.artifacts import artifact_exists, read_artifact
+from engine.metrics import write_stage_metrics
+from engine.sketch import SCORE_METRIC, population_sketches, save_sketches
+
+# -----------------------------
+# Configuration
+# -----------------------------
+DATA_PATH = "data/synthetic_behavior"
+DRIFT_PATH = "data/drift_scores"
+OUTPUT_PATH = "data/population_sketches.npz"
+
+FEATURE_COLUMNS = [
+    "session_count",
+    "avg_session_duration",
+    "active_hours_entropy",
+    "action_type_entropy",
+    "inter_day_variability"
+]
+
+assert artifact_exists(DATA_PATH), "Missing synthetic_behavior artifact (run generate_data.py)"
+assert artifact_exists(DRIFT_PATH), "Missing drift_scores artifact (run compute_drift.py)"
+
+# -----------------------------
+# Load data
+# -----------------------------
+start = time.perf_counter()
+df = read_artifact(DATA_PATH, columns=["user_id", "day"] + FEATURE_COLUMNS)
+drift_df = read_artifact(DRIFT_PATH, columns=["user_id", "day", "drift_score"])
+
+# -----------------------------
+# Build sketches
+# -----------------------------
+# One t-digest per (metric, day, signup cohort); size does not grow with users
+sketches = population_sketches(df, drift_df, FEATURE_COLUMNS)
+
+# -----------------------------
+# Save sketches
+# -----------------------------
+save_sketches(sketches, OUTPUT_PATH)
+
+write_stage_metrics(
+    "sketches",
+    time.perf_counter() - start,
+    {
+        "synthetic_behavior": len(df),
+        "drift_scores": len(drift_df),
+        "population_sketches": len(sketches),
+    },
+)
+
+last_day = int(drift_df["day"].max())
+p50, p90, p99 = sketches.quantiles(SCORE_METRIC, last_day, [0.5, 0.9, 0.99])
+print(
+    f"Population sketches: {len(sketches)} "
+    f"({len(FEATURE_COLUMNS) + 1} metrics, {sketches.nbytes / 1e3:.0f} KB)\n"
+    f"Day {last_day} drift score p50 / p90 / p99: {p50:.4f} / {p90:.4f} / {p99:.4f}\n"
+    f"Saved to: {OUTPUT_PATH}"
+)
@@ -1,72 +1,103 @@
-import pandas as pd
-import numpy as np
+import time
+
+from engine.artifacts import artifact_columns, read_artifact, write_artifact
+from engine.leaderboard import Leaderboard
+from engine.metrics import write_stage_metrics
+from engine.onset import CONSECUTIVE_DAYS, DRIFT_THRESHOLD, onset_frame, score_onsets
+from engine.representation import representation_columns
+from engine.scoring import score_representations
+from engine.store import write_score_store
 
 # -----------------------------
 # Configuration
 # -----------------------------
-REPRESENTATION_PATH = "data/behavior_representations.csv"
-OUTPUT_PATH = "data/drift_scores.csv"
+# Artifact stems; the file format is resolved by engine.artifacts
+REPRESENTATION_PATH = "data/behavior_representations"
+OUTPUT_PATH = "data/drift_scores"
+EXPLAIN_OUTPUT_PATH = "data/drift_explanations"
+LEADERBOARD_OUTPUT_PATH = "data/drift_leaderboard"
+ONSET_OUTPUT_PATH = "data/drift_onsets"
+STORE_PATH = "data/score_store"
 
 REFERENCE_WINDOW = 30
 CURRENT_WINDOW = 14
 EPSILON = 1e-8
+TOP_K = 3
 
-FEATURE_COLUMNS = [
-    "session_count_mean_14d",
-    "avg_session_duration_mean_14d",
-    "active_hours_entropy_mean_14d",
-    "action_type_entropy_mean_14d",
-    "inter_day_variability_mean_14d"
-]
+# Drift scorer, any of engine.scorers.SCORING_MODES: "l2" (normalized
+# distance of window means), "zscore", "mahalanobis", "jensen_shannon",
+# "wasserstein" or "psi"
+SCORING_MODE = "l2"
 
-# -----------------------------
-# Load representations
-# -----------------------------
-df = pd.read_csv(REPRESENTATION_PATH)
-df = df.sort_values(by=["user_id", "day"]).reset_index(drop=True)
+# Representation columns that are scored, by statistic and window (None
+# scores every one the representation stage wrote)
+SCORE_STATISTICS = ["mean"]
+SCORE_WINDOWS = [14]
 
 # -----------------------------
-# Drift computation
+# Load representations
 # -----------------------------
-drift_rows = []
-
-for user_id, user_df in df.groupby("user_id"):
-    user_df = user_df.reset_index(drop=True)
-
-    min_required = REFERENCE_WINDOW + CURRENT_WINDOW
-    if len(user_df) < min_required:
-        continue
+start = time.perf_counter()
 
-    for idx in range(min_required - 1, len(user_df)):
-        ref_start = idx - CURRENT_WINDOW - REFERENCE_WINDOW + 1
-        ref_end = idx - CURRENT_WINDOW + 1
-        cur_start = idx - CURRENT_WINDOW + 1
-        cur_end = idx + 1
+# Scored columns are discovered from the artifact's schema; only those are read
+FEATURE_COLUMNS, FEATURE_LABELS = representation_columns(
+    artifact_columns(REPRESENTATION_PATH), SCORE_STATISTICS, SCORE_WINDOWS
+)
+assert FEATURE_COLUMNS, "No matching representation columns (run build_representation.py)"
 
-        ref_window = user_df.iloc[ref_start:ref_end]
-        cur_window = user_df.iloc[cur_start:cur_end]
+df = read_artifact(REPRESENTATION_PATH, columns=["user_id", "day"] + FEATURE_COLUMNS)
 
-        mu_ref = ref_window[FEATURE_COLUMNS].mean().values
-        mu_cur = cur_window[FEATURE_COLUMNS].mean().values
+# -----------------------------
+# Drift computation + explanation
+# -----------------------------
+# Scores and top-K contributions share the same window means
+drift_df, explain_df = score_representations(
+    df,
+    FEATURE_COLUMNS,
+    FEATURE_LABELS,
+    REFERENCE_WINDOW,
+    CURRENT_WINDOW,
+    EPSILON,
+    TOP_K,
+    SCORING_MODE,
+)
 
-        # Normalized L2 drift score
-        drift_score = np.linalg.norm(mu_cur - mu_ref) / (
-            np.linalg.norm(mu_ref) + EPSILON
-        )
+# Per-user max / mean / std / latest, kept sorted for top-K and range queries
+leaderboard = Leaderboard.from_scores(drift_df)
 
-        drift_rows.append({
-            "user_id": user_id,
-            "day": int(user_df.loc[idx, "day"]),
-            "drift_score": drift_score
-        })
+# First run of CONSECUTIVE_DAYS days above DRIFT_THRESHOLD, per user
+onset_users, onset_days = score_onsets(drift_df, DRIFT_THRESHOLD, CONSECUTIVE_DAYS)
+onset_df = onset_frame(onset_users, onset_days)
 
 # -----------------------------
-# Save drift scores
+# Save drift scores + explanations
 # -----------------------------
-drift_df = pd.DataFrame(drift_rows)
-drift_df.to_csv(OUTPUT_PATH, index=False)
+drift_file = write_artifact(drift_df, OUTPUT_PATH)
+explain_file = write_artifact(explain_df, EXPLAIN_OUTPUT_PATH)
+leaderboard_file = write_artifact(leaderboard.to_frame(), LEADERBOARD_OUTPUT_PATH)
+onset_file = write_artifact(onset_df, ONSET_OUTPUT_PATH)
+
+# Memory-mapped copy served by the API
+write_score_store(STORE_PATH, drift_df, explain_df, leaderboard, onset_days)
+
+write_stage_metrics(
+    "scoring",
+    time.perf_counter() - start,
+    {
+        "behavior_representations": len(df),
+        "drift_scores": len(drift_df),
+        "drift_explanations": len(explain_df),
+        "drift_leaderboard": len(leaderboard),
+        "drift_onsets": len(onset_df),
+    },
+)
 
 print(
     f"Drift scores computed: {drift_df.shape}\n"
-    f"Saved to: {OUTPUT_PATH}"
+    f"Saved to: {drift_file}\n"
+    f"Drift explanations generated: {explain_df.shape}\n"
+    f"Saved to: {explain_file}\n"
+    f"Leaderboard: {len(leaderboard)} users, saved to: {leaderboard_file}\n"
+    f"Drift onsets: {len(onset_df)} users, saved to: {onset_file}\n"
+    f"Score store: {STORE_PATH}"
 )
@@ -0,0 +1,54 @@
+import os
+import time
+
+from engine.artifacts import artifact_exists, read_artifact, write_artifact
+from engine.changepoint import changepoint_frame, empty_detector_state, feed_scores
+from engine.incremental import load_state, save_state
+from engine.metrics import write_stage_metrics
+
+# -----------------------------
+# Configuration
+# -----------------------------
+DRIFT_PATH = "data/drift_scores"
+OUTPUT_PATH = "data/drift_changepoints"
+
+# Detector state carried between runs (shared with update_daily.py); delete
+# it to replay the full score history, e.g. after changing the scoring mode
+STATE_PATH = "data/changepoint_state.npz"
+
+assert artifact_exists(DRIFT_PATH), "Missing drift_scores artifact (run compute_drift.py)"
+
+# -----------------------------
+# Load state + scores
+# -----------------------------
+start = time.perf_counter()
+
+state = load_state(STATE_PATH) if os.path.exists(STATE_PATH) else empty_detector_state()
+drift_df = read_artifact(DRIFT_PATH, columns=["user_id", "day", "drift_score"])
+
+# -----------------------------
+# Advance CUSUM / Page-Hinkley detectors
+# -----------------------------
+# Only days after each user's last fed-in day are processed
+state = feed_scores(state, drift_df)
+changepoint_df = changepoint_frame(state)
+
+# -----------------------------
+# Save state + alarms
+# -----------------------------
+save_state(state, STATE_PATH)
+output_file = write_artifact(changepoint_df, OUTPUT_PATH)
+
+write_stage_metrics(
+    "changepoint",
+    time.perf_counter() - start,
+    {"drift_scores": len(drift_df), "drift_changepoints": len(changepoint_df)},
+)
+
+print(
+    f"Change-point detectors updated: {len(changepoint_df)} users\n"
+    f"CUSUM alarms: {(changepoint_df['cusum_alarm_day'] >= 0).sum()} users\n"
+    f"Page-Hinkley alarms: {(changepoint_df['page_hinkley_alarm_day'] >= 0).sum()} users\n"
+    f"Saved to: {output_file}\n"
+    f"State saved to: {STATE_PATH}"
+)
@@ -0,0 +1,359 @@
+import os
+import struct
+import zipfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .keys import decode_keys, encode_keys, key_codes
+
+try:
+    import pyarrow  # noqa: F401 (parquet engine)
+except ImportError:
+    pyarrow = None
+
+# -----------------------------
+# Configuration
+# -----------------------------
+# Format used when a stage writes an artifact ("npz", "parquet" or "csv")
+DEFAULT_FORMAT = os.environ.get("BDO_ARTIFACT_FORMAT", "npz")
+
+FORMAT_SUFFIXES = {
+    "npz": ".npz",
+    "parquet": ".parquet",
+    "csv": ".csv",
+}
+
+COLUMNS_KEY = "__columns__"
+CODES_SUFFIX = "__codes"
+DICT_SUFFIX = "__dict"
+
+
+# -----------------------------
+# Path resolution
+# -----------------------------
+def artifact_path(stem, fmt=None):
+    """File path of an artifact stem (e.g. data/drift_scores) in a format"""
+    fmt = fmt or DEFAULT_FORMAT
+    if fmt not in FORMAT_SUFFIXES:
+        raise ValueError(f"Unknown artifact format: {fmt}")
+
+    return Path(f"{stem}{FORMAT_SUFFIXES[fmt]}")
+
+
+def available_formats():
+    """Formats that can be used in this environment"""
+    return [fmt for fmt in FORMAT_SUFFIXES if fmt != "parquet" or pyarrow is not None]
+
+
+def artifact_exists(stem):
+    """Whether an artifact has been written in any format"""
+    return any(artifact_path(stem, fmt).exists() for fmt in FORMAT_SUFFIXES)
+
+
+def find_artifact(stem):
+    """(path, format) of the most recently written copy of an artifact"""
+    found = [
+        (artifact_path(stem, fmt), fmt)
+        for fmt in FORMAT_SUFFIXES
+        if artifact_path(stem, fmt).exists()
+    ]
+    if not found:
+        raise FileNotFoundError(f"No artifact found for {stem}")
+
+    return max(found, key=lambda item: item[0].stat().st_mtime_ns)
+
+
+# -----------------------------
+# NumPy layout
+# -----------------------------
+def _write_npz(df, path):
+    """
+    One array per column; string columns are dictionary-encoded, and
+    categorical columns are written straight from their codes.
+    """
+    arrays = {COLUMNS_KEY: np.array(df.columns, dtype=str)}
+
+    for column in df.columns:
+        values = df[column].to_numpy()
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            arrays[column + CODES_SUFFIX] = df[column].cat.codes.to_numpy(np.int32)
+            arrays[column + DICT_SUFFIX] = np.asarray(df[column].cat.categories, dtype=str)
+        elif not pd.api.types.is_numeric_dtype(df[column]):
+            dictionary, codes = np.unique(values.astype(str), return_inverse=True)
+            arrays[column + CODES_SUFFIX] = codes.astype(np.int32)
+            arrays[column + DICT_SUFFIX] = dictionary
+        else:
+            arrays[column] = values
+
+    with open(path, "wb") as f:
+        np.savez(f, **arrays)
+
+
+def _read_npz(path, columns=None):
+    with np.load(path, allow_pickle=False) as npz:
+        names = npz[COLUMNS_KEY].tolist()
+        data = {}
+
+        for column in columns or names:
+            if column + CODES_SUFFIX in npz:
+                data[column] = pd.Categorical.from_codes(
+                    npz[column + CODES_SUFFIX], npz[column + DICT_SUFFIX].astype(object)
+                )
+            else:
+                data[column] = npz[column]
+
+    return pd.DataFrame(data)
+
+
+def _map_npz(path):
+    """
+    Read-only memory maps of every member of an .npz, keyed by array name.
+
+    np.savez stores members uncompressed, so each .npy body sits at a fixed
+    offset in the file and only the rows that are sliced get paged in.
+    """
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, "rb") as f:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"{path} is compressed and cannot be read in chunks")
+
+            # Local file header: 30 fixed bytes, then the name and extra field
+            f.seek(info.header_offset)
+            name_length, extra_length = struct.unpack("<HH", f.read(30)[26:30])
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+
+            name = info.filename.removesuffix(".npy")
+            if np.prod(shape) == 0:
+                arrays[name] = np.zeros(shape, dtype=dtype)
+            else:
+                arrays[name] = np.memmap(
+                    path, dtype=dtype, mode="r", offset=f.tell(), shape=shape,
+                    order="F" if fortran_order else "C",
+                )
+
+    return arrays
+
+
+def _iter_npz_chunks(path, chunk_rows):
+    arrays = _map_npz(path)
+    columns = arrays[COLUMNS_KEY].tolist()
+    first = columns[0] + CODES_SUFFIX if columns[0] + CODES_SUFFIX in arrays else columns[0]
+
+    for lo in range(0, len(arrays[first]), chunk_rows):
+        data = {}
+        for column in columns:
+            if column + CODES_SUFFIX in arrays:
+                # Only the names used in this chunk are materialized
+                used, codes = np.unique(
+                    arrays[column + CODES_SUFFIX][lo:lo + chunk_rows], return_inverse=True
+                )
+                data[column] = pd.Categorical.from_codes(
+                    codes.astype(np.int32),
+                    np.asarray(arrays[column + DICT_SUFFIX][used]).astype(object),
+                )
+            else:
+                data[column] = np.array(arrays[column][lo:lo + chunk_rows])
+
+        yield pd.DataFrame(data)
+
+
+# -----------------------------
+# Public API
+# -----------------------------
+def write_artifact(df, stem, fmt=None):
+    """Write a DataFrame artifact and return the path it was written to"""
+    fmt = fmt or DEFAULT_FORMAT
+    path = artifact_path(stem, fmt)
+
+    if fmt == "npz":
+        _write_npz(df, path)
+    elif fmt == "parquet":
+        if pyarrow is None:
+            raise ImportError("Parquet artifacts require pyarrow")
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+
+    return path
+
+
+def read_artifact(stem, fmt=None, columns=None):
+    """
+    Read an artifact; without a format the newest copy on disk is used.
+
+    Key columns (engine.keys) come back as categoricals in every format.
+    """
+    if fmt is None:
+        path, fmt = find_artifact(stem)
+    else:
+        path = artifact_path(stem, fmt)
+
+    if fmt == "npz":
+        df = _read_npz(path, columns)
+    elif fmt == "parquet":
+        if pyarrow is None:
+            raise ImportError("Parquet artifacts require pyarrow")
+        df = pd.read_parquet(path, columns=columns)
+    else:
+        df = pd.read_csv(path, usecols=columns)
+
+    return encode_keys(df)
+
+
+def artifact_columns(stem, fmt=None):
+    """Column names of an artifact, read from its header / schema only"""
+    if fmt is None:
+        path, fmt = find_artifact(stem)
+    else:
+        path = artifact_path(stem, fmt)
+
+    if fmt == "npz":
+        with np.load(path, allow_pickle=False) as npz:
+            return npz[COLUMNS_KEY].tolist()
+    if fmt == "parquet":
+        if pyarrow is None:
+            raise ImportError("Parquet artifacts require pyarrow")
+        import pyarrow.parquet as pq
+
+        return pq.read_schema(path).names
+    return pd.read_csv(path, nrows=0).columns.tolist()
+
+
+# -----------------------------
+# Streaming (bounded memory)
+# -----------------------------
+# Formats that can be appended to; every format can be read in row chunks
+STREAMING_FORMATS = ("parquet", "csv")
+
+
+def streaming_format():
+    """Write format for streamed artifacts: the default when it can append"""
+    if DEFAULT_FORMAT in STREAMING_FORMATS:
+        return DEFAULT_FORMAT
+    return "parquet" if pyarrow is not None else "csv"
+
+
+def iter_artifact_chunks(stem, chunk_rows, fmt=None):
+    """Yield an artifact as DataFrames of at most `chunk_rows` rows"""
+    if fmt is None:
+        path, fmt = find_artifact(stem)
+    else:
+        path = artifact_path(stem, fmt)
+
+    if fmt == "csv":
+        for chunk in pd.read_csv(path, chunksize=chunk_rows):
+            yield encode_keys(chunk)
+    elif fmt == "parquet":
+        if pyarrow is None:
+            raise ImportError("Parquet artifacts require pyarrow")
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+            yield encode_keys(batch.to_pandas())
+    else:
+        for chunk in _iter_npz_chunks(path, chunk_rows):
+            yield encode_keys(chunk)
+
+
+def iter_user_chunks(chunks):
+    """
+    Regroup row chunks so no user is split across two chunks.
+
+    Input rows must be grouped by user. The trailing user of each chunk is
+    carried over to the next one.
+    """
+    carry = None
+
+    for chunk in chunks:
+        if carry is not None:
+            # Chunks carry their own dictionaries; re-intern the union
+            chunk = encode_keys(pd.concat([carry, chunk], ignore_index=True))
+
+        user_ids = key_codes(chunk["user_id"])
+        other = np.flatnonzero(user_ids != user_ids[-1])
+        tail_start = other[-1] + 1 if len(other) else 0
+
+        carry = chunk.iloc[tail_start:]
+        if tail_start > 0:
+            yield chunk.iloc[:tail_start].reset_index(drop=True)
+
+    if carry is not None and len(carry):
+        yield carry.reset_index(drop=True)
+
+
+class ArtifactWriter:
+    """
+    Append DataFrames to one artifact chunk by chunk.
+
+    Once the stream completes, copies of the artifact in other formats are
+    deleted, so readers resolve the stem to this file whatever the mtimes.
+    """
+
+    def __init__(self, stem, fmt=None):
+        self.format = fmt or streaming_format()
+        if self.format not in STREAMING_FORMATS:
+            raise ValueError(f"{self.format} artifacts cannot be appended to")
+        if self.format == "parquet" and pyarrow is None:
+            raise ImportError("Parquet artifacts require pyarrow")
+
+        self.stem = stem
+        self.path = artifact_path(stem, self.format)
+        self.rows = 0
+        self._parquet = None
+        self._empty = None
+
+        if self.path.exists():
+            self.path.unlink()
+
+    def write(self, df):
+        if len(df) == 0:
+            # Keep the columns so an all-empty stream still writes a header
+            if self._empty is None:
+                self._empty = df
+            return
+
+        if self.format == "csv":
+            df.to_csv(self.path, mode="a", header=self.rows == 0, index=False)
+        else:
+            import pyarrow.parquet as pq
+
+            # Per-chunk dictionaries would change the file schema between
+            # row groups, so key columns are written as plain strings
+            table = pyarrow.Table.from_pandas(decode_keys(df), preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table)
+
+        self.rows += len(df)
+
+    def close(self, complete=True):
+        """Finish the file; `complete=False` (a failed stream) keeps other copies"""
+        if self.rows == 0 and self._empty is not None:
+            if self.format == "csv":
+                self._empty.to_csv(self.path, index=False)
+            else:
+                decode_keys(self._empty).to_parquet(self.path, index=False)
+
+        if self._parquet is not None:
+            self._parquet.close()
+            self._parquet = None
+
+        if complete and self.path.exists():
+            for fmt in FORMAT_SUFFIXES:
+                if fmt != self.format:
+                    artifact_path(self.stem, fmt).unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        self.close(complete=exc_type is None)
@@ -0,0 +1,208 @@
+import os
+from pathlib import Path
+
+import numpy as np
+
+from .keys import key_offsets, key_positions, sorted_categorical
+from .representation import (
+    build_representations,
+    group_positions,
+    representation_column,
+)
+from .scorers import ScoringWindows, get_scorer
+from .scoring import score_frames
+
+# -----------------------------
+# State layout
+# -----------------------------
+# Per-user state is a dict of arrays, one row per user (sorted by user id):
+#   users       user ids
+#   last_day    last ingested day (-1 before the first one)
+#   raw_count   raw rows seen so far
+#   raw_ring    last `window_size` raw feature rows   (users x window x F)
+#   rep_count   representation rows seen so far
+#   rep_ring    last `reference + current` rep rows   (users x history x F)
+# Rows are written to slot `count % ring_size`, so an update touches one slot
+# per user and no history is ever rescanned.
+
+
+def empty_state(n_features, window_size, history_size):
+    return {
+        "users": np.zeros(0, dtype=str),
+        "last_day": np.zeros(0, dtype=np.int64),
+        "raw_count": np.zeros(0, dtype=np.int64),
+        "raw_ring": np.zeros((0, window_size, n_features)),
+        "rep_count": np.zeros(0, dtype=np.int64),
+        "rep_ring": np.zeros((0, history_size, n_features)),
+    }
+
+
+def _ring_window(ring, count, window):
+    """Last `window` rows of each user's ring in chronological order"""
+    size = ring.shape[1]
+    slots = (count[:, None] - window + np.arange(window)) % size
+    return np.take_along_axis(ring, slots[:, :, None], axis=1)
+
+
+def _add_users(state, new_users):
+    """Return the state extended with zeroed rows for unseen users"""
+    users = np.union1d(state["users"], new_users)
+    if len(users) == len(state["users"]):
+        return state
+
+    rows = np.searchsorted(users, state["users"])
+    grown = {"users": users}
+
+    for name, array in state.items():
+        if name == "users":
+            continue
+        fill = -1 if name == "last_day" else 0
+        out = np.full((len(users),) + array.shape[1:], fill, dtype=array.dtype)
+        out[rows] = array
+        grown[name] = out
+
+    return grown
+
+
+# -----------------------------
+# Bootstrap from history
+# -----------------------------
+def state_from_history(
+    df, feature_columns, window_size, reference_window, current_window
+):
+    """Seed the state from a full raw history (one vectorized pass)"""
+    history_size = reference_window + current_window
+    state = empty_state(len(feature_columns), window_size, history_size)
+
+    df = df.sort_values(by=["user_id", "day"]).reset_index(drop=True)
+    rep_df = build_representations(df, feature_columns, [(window_size, ("mean",))])
+    rep_columns = [
+        representation_column(feature, "mean", window_size) for feature in feature_columns
+    ]
+
+    state = _add_users(state, key_offsets(df["user_id"])[0])
+    users = state["users"]
+
+    for frame, columns, prefix in (
+        (df, feature_columns, "raw"),
+        (rep_df, rep_columns, "rep"),
+    ):
+        user_rows = key_positions(frame["user_id"], users)
+        positions = group_positions(user_rows)
+
+        counts = np.bincount(user_rows, minlength=len(users))
+        ring = state[f"{prefix}_ring"]
+        size = ring.shape[1]
+
+        # Only rows still inside each user's ring are kept
+        keep = positions >= counts[user_rows] - size
+        ring[user_rows[keep], positions[keep] % size] = (
+            frame[columns].to_numpy(dtype=np.float64)[keep]
+        )
+        state[f"{prefix}_count"] = counts.astype(np.int64)
+
+    raw_rows = key_positions(df["user_id"], users)
+    np.maximum.at(state["last_day"], raw_rows, df["day"].to_numpy(dtype=np.int64))
+
+    return state
+
+
+# -----------------------------
+# Daily ingest
+# -----------------------------
+def ingest_day(
+    state,
+    day_df,
+    feature_columns,
+    feature_labels,
+    reference_window,
+    current_window,
+    epsilon,
+    top_k,
+    mode="l2",
+):
+    """
+    Fold one new day of raw rows into the state.
+
+    Updates each affected user's rolling mean and reference/current windows
+    and returns (state, drift_df, explain_df) holding only the new rows,
+    scored with one of engine.scorers.SCORING_MODES. Cost is proportional
+    to the number of users in `day_df`.
+    """
+    scorer = get_scorer(mode)
+
+    day_df = day_df.sort_values(by="user_id").reset_index(drop=True)
+    user_ids = day_df["user_id"].to_numpy().astype(str)
+
+    if len(np.unique(user_ids)) != len(user_ids):
+        raise ValueError("Daily update contains more than one row per user")
+
+    state = _add_users(state, user_ids)
+    rows = np.searchsorted(state["users"], user_ids)
+    days = day_df["day"].to_numpy(dtype=np.int64)
+
+    if np.any(days <= state["last_day"][rows]):
+        raise ValueError("Daily update contains days that were already ingested")
+
+    window_size = state["raw_ring"].shape[1]
+    history_size = state["rep_ring"].shape[1]
+
+    # Raw ring -> rolling representation
+    raw_count = state["raw_count"][rows]
+    state["raw_ring"][rows, raw_count % window_size] = (
+        day_df[feature_columns].to_numpy(dtype=np.float64)
+    )
+    raw_count += 1
+    state["raw_count"][rows] = raw_count
+    state["last_day"][rows] = days
+
+    has_rep = raw_count >= window_size
+    rep_rows = rows[has_rep]
+    rep = _ring_window(
+        state["raw_ring"][rep_rows], raw_count[has_rep], window_size
+    ).sum(axis=1) / window_size
+
+    # Representation ring -> reference / current windows
+    rep_count = state["rep_count"][rep_rows]
+    state["rep_ring"][rep_rows, rep_count % history_size] = rep
+    rep_count += 1
+    state["rep_count"][rep_rows] = rep_count
+
+    scored = rep_count >= reference_window + current_window
+    history = _ring_window(
+        state["rep_ring"][rep_rows[scored]],
+        rep_count[scored],
+        reference_window + current_window,
+    )
+    # The rings hold each scored user's full reference + current history
+    windows = ScoringWindows.from_history(history, reference_window)
+    scores, contributions = scorer(windows, epsilon)
+
+    drift_df, explain_df = score_frames(
+        sorted_categorical(user_ids[has_rep][scored]),
+        days[has_rep][scored],
+        scores,
+        contributions,
+        feature_labels,
+        top_k,
+    )
+
+    return state, drift_df, explain_df
+
+
+# -----------------------------
+# Persistence
+# -----------------------------
+def save_state(state, path):
+    """Write the state as one compressed .npz, replacing any previous copy"""
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+
+    with open(tmp_path, "wb") as f:
+        np.savez_compressed(f, **state)
+    os.replace(tmp_path, path)
+
+
+def load_state(path):
+    with np.load(path, allow_pickle=False) as npz:
+        return {name: npz[name] for name in npz.files}
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+
+# -----------------------------
+# Key columns
+# -----------------------------
+# String columns that are interned as pandas categoricals throughout the
+# pipeline: one shared dictionary of names plus small integer codes per row.
+# Categories are kept sorted, so ordering, grouping and comparisons on the
+# codes agree with the same operations on the strings.
+KEY_COLUMNS = ("user_id", "feature", "direction")
+
+
+def _categorical(values):
+    """The Categorical behind a Series / Categorical, or None"""
+    if isinstance(values, pd.Series):
+        values = values.array
+    return values if isinstance(values, pd.Categorical) else None
+
+
+def sorted_categorical(values):
+    """Categorical of `values` with lexically sorted categories"""
+    categorical = _categorical(values)
+    if categorical is None:
+        return pd.Categorical(np.asarray(values, dtype=object))
+    if not categorical.categories.is_monotonic_increasing:
+        categorical = categorical.reorder_categories(categorical.categories.sort_values())
+    return categorical
+
+
+def encode_keys(df):
+    """Intern every key column of a DataFrame (in place) and return it"""
+    for column in KEY_COLUMNS:
+        if column in df.columns:
+            df[column] = sorted_categorical(df[column])
+    return df
+
+
+def decode_keys(df):
+    """Copy of a DataFrame with key columns as plain strings"""
+    df = df.copy()
+    for column in KEY_COLUMNS:
+        if column in df.columns and _categorical(df[column]) is not None:
+            df[column] = np.asarray(df[column], dtype=object)
+    return df
+
+
+def key_codes(values):
+    """Integer codes of a key column, or the raw values when not interned"""
+    categorical = _categorical(values)
+    if categorical is None:
+        return np.asarray(values)
+    return categorical.codes
+
+
+def key_names(values):
+    """(names, codes): the dictionary as a str array and per-row codes"""
+    categorical = sorted_categorical(values)
+    return np.asarray(categorical.categories, dtype=str), categorical.codes
+
+
+# -----------------------------
+# Grouping
+# -----------------------------
+def offset_table(user_ids):
+    """Unique users of a grouped column and their len(users) + 1 row offsets"""
+    user_ids = np.asarray(user_ids)
+    n = len(user_ids)
+    if n == 0:
+        return user_ids[:0], np.zeros(1, dtype=np.int64)
+
+    starts = np.flatnonzero(np.r_[True, user_ids[1:] != user_ids[:-1]])
+    return user_ids[starts], np.r_[starts, n].astype(np.int64)
+
+
+def key_offsets(values):
+    """
+    offset_table for a grouped key column, comparing integer codes.
+
+    Only the unique names are turned into strings (a str array), not every
+    row.
+    """
+    categorical = _categorical(values)
+    if categorical is None:
+        return offset_table(np.asarray(values).astype(str))
+
+    names = np.asarray(categorical.categories, dtype=str)
+    codes, offsets = offset_table(categorical.codes)
+    return names[codes], offsets
+
+
+def key_positions(values, names):
+    """Position of every row's key in a sorted str array of names, or -1"""
+    if len(names) == 0:
+        return np.full(len(values), -1, dtype=np.int64)
+
+    categorical = sorted_categorical(values)
+    categories = np.asarray(categorical.categories, dtype=str)
+
+    found = np.minimum(np.searchsorted(names, categories), len(names) - 1)
+    category_positions = np.where(names[found] == categories, found, -1)
+    return category_positions[categorical.codes]
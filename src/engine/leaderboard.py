@@ -0,0 +1,138 @@
+import numpy as np
+import pandas as pd
+
+from .keys import key_offsets
+
+# -----------------------------
+# Layout
+# -----------------------------
+# Per-user summary statistics of the drift score, one row per user. Every
+# statistic also keeps its ascending rank order and the values in that order,
+# so top-K / bottom-K are a slice and a score range is two binary searches.
+LEADERBOARD_STATS = ("max", "mean", "std", "latest")
+
+
+# -----------------------------
+# Statistics
+# -----------------------------
+def user_score_stats(user_ids, scores):
+    """
+    Per-user max, mean, std and latest score of a user-grouped, day-sorted
+    score column (user ids may be a categorical key column).
+
+    Returns (users, stats, latest_days); stats has one column per
+    LEADERBOARD_STATS entry. std is the sample std (ddof=1, as pandas), 0 for
+    users with a single score.
+    """
+    users, offsets = key_offsets(user_ids)
+    scores = np.asarray(scores, dtype=np.float64)
+    stats = np.zeros((len(users), len(LEADERBOARD_STATS)))
+    if len(users) == 0:
+        return users, stats, np.zeros(0, dtype=np.int64)
+
+    starts, last = offsets[:-1], offsets[1:] - 1
+    counts = np.diff(offsets)
+
+    mean = np.add.reduceat(scores, starts) / counts
+    deviation = scores - np.repeat(mean, counts)
+    variance = np.add.reduceat(deviation * deviation, starts) / np.maximum(counts - 1, 1)
+
+    stats[:, 0] = np.maximum.reduceat(scores, starts)
+    stats[:, 1] = mean
+    stats[:, 2] = np.sqrt(variance)
+    stats[:, 3] = scores[last]
+    return users, stats, last
+
+
+# -----------------------------
+# Leaderboard
+# -----------------------------
+class Leaderboard:
+    """
+    Per-user drift statistics kept sorted by every statistic.
+
+    `top`, `bottom` and `between` return row positions in O(log n + k);
+    `rows` turns positions into user ids and statistics.
+    """
+
+    def __init__(self, users, stats, latest_days, order=None, ranked=None):
+        self.users = users
+        self.stats = stats
+        self.latest_days = latest_days
+
+        if order is None:
+            order = np.argsort(stats.T, axis=1, kind="stable")
+            ranked = np.take_along_axis(stats.T, order, axis=1)
+        self.order = order
+        self.ranked = ranked
+
+    @classmethod
+    def from_scores(cls, drift_df):
+        """Build from a drift score frame (user_id, day, drift_score)"""
+        drift_df = drift_df.sort_values(by=["user_id", "day"], kind="stable")
+        users, stats, last = user_score_stats(
+            drift_df["user_id"],
+            drift_df["drift_score"].to_numpy(),
+        )
+        return cls(users, stats, drift_df["day"].to_numpy(dtype=np.int64)[last])
+
+    @classmethod
+    def from_frame(cls, df):
+        """Build from a leaderboard frame written by `to_frame`"""
+        df = df.sort_values(by="user_id", kind="stable")
+        return cls(
+            np.asarray(df["user_id"], dtype=str),
+            df[[f"{stat}_score" for stat in LEADERBOARD_STATS]].to_numpy(dtype=np.float64),
+            df["latest_day"].to_numpy(dtype=np.int64),
+        )
+
+    @classmethod
+    def from_store(cls, store):
+        return cls(
+            store["users"],
+            store["leaderboard_stats"],
+            store["leaderboard_latest_days"],
+            store["leaderboard_order"],
+            store["leaderboard_ranked"],
+        )
+
+    def to_frame(self):
+        df = pd.DataFrame({"user_id": self.users})
+        for j, stat in enumerate(LEADERBOARD_STATS):
+            df[f"{stat}_score"] = self.stats[:, j]
+        df["latest_day"] = self.latest_days
+        return df
+
+    def __len__(self):
+        return len(self.users)
+
+    # Queries return row positions, strongest first for `top`
+    def column(self, stat):
+        if stat not in LEADERBOARD_STATS:
+            raise ValueError(f"Unknown leaderboard stat: {stat!r}")
+        return LEADERBOARD_STATS.index(stat)
+
+    def top(self, stat, k):
+        j = self.column(stat)
+        n = len(self.users)
+        return np.asarray(self.order[j, max(n - k, 0):][::-1])
+
+    def bottom(self, stat, k):
+        return np.asarray(self.order[self.column(stat), :k])
+
+    def range_bounds(self, stat, low, high):
+        j = self.column(stat)
+        lo = np.searchsorted(self.ranked[j], low, side="left")
+        hi = np.searchsorted(self.ranked[j], high, side="right")
+        return int(lo), int(max(hi, lo))
+
+    def between(self, stat, low, high, limit=None):
+        """Positions with low <= stat <= high, ascending by stat"""
+        lo, hi = self.range_bounds(stat, low, high)
+        if limit is not None:
+            hi = min(hi, lo + limit)
+        return np.asarray(self.order[self.column(stat), lo:hi])
+
+    def rows(self, positions):
+        """(user_ids, stats, latest_days) for row positions"""
+        return self.users[positions], self.stats[positions], self.latest_days[positions]
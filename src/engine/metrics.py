@@ -0,0 +1,222 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+
+# -----------------------------
+# Configuration
+# -----------------------------
+# Latency buckets in seconds (Prometheus `le` bounds)
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+)
+
+STAGE_METRICS_DIR = os.environ.get("BDO_METRICS_DIR", "data/metrics")
+
+
+# -----------------------------
+# Per-thread storage
+# -----------------------------
+class _Shards:
+    """
+    One flat list of slots per thread, summed when scraped.
+
+    Writers only touch their own thread's list, so no locks are taken on
+    the hot path; registering a new thread's list is a single append.
+    """
+
+    def __init__(self):
+        self._size = 0
+        self._local = threading.local()
+        self._all = []
+
+    def allocate(self, n):
+        start = self._size
+        self._size += n
+        return start
+
+    def values(self):
+        values = getattr(self._local, "values", None)
+        if values is None:
+            values = self._local.values = []
+            self._all.append(values)
+        if len(values) < self._size:
+            # Metrics registered after this thread first recorded
+            values.extend([0.0] * (self._size - len(values)))
+        return values
+
+    def totals(self):
+        totals = [0.0] * self._size
+        for values in list(self._all):
+            for i, value in enumerate(values):
+                totals[i] += value
+        return totals
+
+
+_shards = _Shards()
+
+
+# -----------------------------
+# Metric children
+# -----------------------------
+# Children are created once (at import/startup) for each label value and
+# held by the caller, so recording never builds label dicts or keys.
+class CounterChild:
+    def __init__(self):
+        self._slot = _shards.allocate(1)
+
+    def inc(self, amount=1):
+        _shards.values()[self._slot] += amount
+
+
+class HistogramChild:
+    def __init__(self, buckets):
+        self._buckets = buckets
+        # slots: one per bucket (+Inf last), then count, then sum
+        self._slot = _shards.allocate(len(buckets) + 3)
+
+    def observe(self, value):
+        values = _shards.values()
+        values[self._slot + bisect_left(self._buckets, value)] += 1
+        values[self._slot + len(self._buckets) + 1] += 1
+        values[self._slot + len(self._buckets) + 2] += value
+
+
+class GaugeChild:
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value):
+        self.value = float(value)
+
+
+# -----------------------------
+# Metric families
+# -----------------------------
+class _Family:
+    kind = None
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.children = {}
+        REGISTRY.append(self)
+
+    def labels(self, *values):
+        """Child for these label values; call at setup, keep the result"""
+        child = self.children.get(values)
+        if child is None:
+            child = self.children[values] = self._new_child()
+        return child
+
+    def _label_text(self, values, extra=()):
+        pairs = list(zip(self.label_names, values)) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+class Counter(_Family):
+    kind = "counter"
+
+    def _new_child(self):
+        return CounterChild()
+
+    def render(self, totals):
+        for values, child in self.children.items():
+            yield f"{self.name}{self._label_text(values)} {_fmt(totals[child._slot])}"
+
+
+class Histogram(_Family):
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        super().__init__(name, help, labels)
+
+    def _new_child(self):
+        return HistogramChild(self.buckets)
+
+    def render(self, totals):
+        for values, child in self.children.items():
+            slot = child._slot
+            cumulative = 0.0
+            for i, bound in enumerate(self.buckets + (float("inf"),)):
+                cumulative += totals[slot + i]
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                yield (
+                    f"{self.name}_bucket{self._label_text(values, [('le', le)])} "
+                    f"{_fmt(cumulative)}"
+                )
+            n = len(self.buckets)
+            yield f"{self.name}_count{self._label_text(values)} {_fmt(totals[slot + n + 1])}"
+            yield f"{self.name}_sum{self._label_text(values)} {_fmt(totals[slot + n + 2])}"
+
+
+class Gauge(_Family):
+    kind = "gauge"
+
+    def _new_child(self):
+        return GaugeChild()
+
+    def render(self, totals):
+        for values, child in self.children.items():
+            yield f"{self.name}{self._label_text(values)} {_fmt(child.value)}"
+
+
+REGISTRY = []
+
+
+def _fmt(value):
+    """Full-precision sample value (integers without a trailing .0)"""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def render_metrics():
+    """All registered metrics in Prometheus text exposition format"""
+    totals = _shards.totals()
+    lines = []
+    for family in REGISTRY:
+        lines.append(f"# HELP {family.name} {family.help}")
+        lines.append(f"# TYPE {family.name} {family.kind}")
+        lines.extend(family.render(totals))
+    return "\n".join(lines) + "\n"
+
+
+# -----------------------------
+# Pipeline stage metrics
+# -----------------------------
+def write_stage_metrics(stage, seconds, rows, directory=None):
+    """
+    Write <stage>.prom (node-exporter textfile format) atomically.
+
+    `rows` maps artifact name -> row count read or written by the stage.
+    """
+    directory = Path(directory or STAGE_METRICS_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    lines = [
+        "# HELP bdo_stage_duration_seconds Wall time of the last stage run",
+        "# TYPE bdo_stage_duration_seconds gauge",
+        f'bdo_stage_duration_seconds{{stage="{stage}"}} {seconds:.6f}',
+        "# HELP bdo_stage_rows Rows read or written by the last stage run",
+        "# TYPE bdo_stage_rows gauge",
+    ]
+    lines += [
+        f'bdo_stage_rows{{stage="{stage}",artifact="{name}"}} {count}'
+        for name, count in rows.items()
+    ]
+    lines += [
+        "# HELP bdo_stage_completed_timestamp_seconds Unix time the stage finished",
+        "# TYPE bdo_stage_completed_timestamp_seconds gauge",
+        f'bdo_stage_completed_timestamp_seconds{{stage="{stage}"}} {time.time():.3f}',
+    ]
+
+    path = directory / f"{stage}.prom"
+    tmp_path = directory / f".{stage}.prom.tmp"
+    tmp_path.write_text("\n".join(lines) + "\n")
+    os.replace(tmp_path, path)
+    return path
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+from .keys import key_offsets
+
+# -----------------------------
+# Definition of sustained drift
+# -----------------------------
+# Shared by the scoring stage, the API fallback and the evaluation scripts
+DRIFT_THRESHOLD = 0.15
+CONSECUTIVE_DAYS = 3
+
+
+# -----------------------------
+# Onset detection kernel
+# -----------------------------
+def detect_onsets(user_ids, days, scores, threshold, consecutive_days):
+    """
+    First day of the first run of `consecutive_days` consecutive days with a
+    score above `threshold`, for every user at once.
+
+    Rows must be grouped by user and sorted by day. A run is broken by a
+    score at or below the threshold, a new user, or a gap in days. Returns
+    (users, onset_days) with -1 for users without sustained drift.
+    """
+    users, offsets = key_offsets(user_ids)
+    onset_days = np.full(len(users), -1, dtype=np.int64)
+    n = len(scores)
+    if n == 0:
+        return users, onset_days
+
+    days = np.asarray(days, dtype=np.int64)
+    above = np.asarray(scores) > threshold
+
+    # A run starts on every above-threshold row that does not continue the
+    # previous row's run
+    continues = np.zeros(n, dtype=bool)
+    continues[1:] = above[:-1] & (days[1:] == days[:-1] + 1)
+    continues[offsets[:-1]] = False
+    run_starts = above & ~continues
+
+    # Start row of the run each row belongs to; length so far = row - start
+    run_start_rows = np.maximum.accumulate(np.where(run_starts, np.arange(n), 0))
+    run_length = np.arange(n) - run_start_rows + 1
+
+    # Rows where a run reaches the required length; keep the first per user
+    reached = np.flatnonzero(above & (run_length == consecutive_days))
+    owners = np.searchsorted(offsets, reached, side="right") - 1
+    owners, first = np.unique(owners, return_index=True)
+
+    onset_days[owners] = days[run_start_rows[reached[first]]]
+    return users, onset_days
+
+
+def onset_frame(users, onset_days):
+    """Users with a detected onset and their onset day"""
+    detected = onset_days >= 0
+    return pd.DataFrame({
+        "user_id": users[detected],
+        "onset_day": onset_days[detected],
+    })
+
+
+def score_onsets(drift_df, threshold, consecutive_days):
+    """(users, onset_days) for a drift score frame (user_id, day, drift_score)"""
+    drift_df = drift_df.sort_values(by=["user_id", "day"], kind="stable")
+    return detect_onsets(
+        drift_df["user_id"],
+        drift_df["day"].to_numpy(),
+        drift_df["drift_score"].to_numpy(),
+        threshold,
+        consecutive_days,
+    )
@@ -0,0 +1,105 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .representation import build_representations, representation_columns
+from .scoring import score_representations
+from .keys import key_codes, offset_table
+from .sketch import QuantileSketches, population_sketches
+
+
+# -----------------------------
+# Sharding
+# -----------------------------
+def shard_bounds(user_ids, shard_size):
+    """Row ranges covering `shard_size` consecutive users each"""
+    _, offsets = offset_table(user_ids)
+    cuts = offsets[::shard_size]
+    if cuts[-1] != offsets[-1]:
+        cuts = np.r_[cuts, offsets[-1]]
+    return list(zip(cuts[:-1].tolist(), cuts[1:].tolist()))
+
+
+# -----------------------------
+# Per-shard work
+# -----------------------------
+_worker_df = None
+
+
+def _init_worker(df):
+    # Each worker receives the dataset once; shards are then plain row ranges
+    global _worker_df
+    _worker_df = df
+
+
+def process_shard(df, config):
+    """
+    Representation, scoring, explanation and population sketches for one
+    group of users
+    """
+    rep_df = build_representations(
+        df, config["feature_columns"], config["window_specs"]
+    )
+    rep_columns, rep_labels = representation_columns(
+        rep_df.columns, config["score_statistics"], config["score_windows"]
+    )
+    drift_df, explain_df = score_representations(
+        rep_df,
+        rep_columns,
+        rep_labels,
+        config["reference_window"],
+        config["current_window"],
+        config["epsilon"],
+        config["top_k"],
+        config["scoring_mode"],
+    )
+    sketches = population_sketches(df, drift_df, config["feature_columns"])
+    return rep_df, drift_df, explain_df, sketches
+
+
+def _process_range(bounds, config):
+    start, end = bounds
+    return process_shard(_worker_df.iloc[start:end], config)
+
+
+# -----------------------------
+# Runner
+# -----------------------------
+def run_sharded(df, config, workers, shard_size):
+    """
+    Run all per-user stages across a process pool.
+
+    Users are split into contiguous shards of `shard_size`; shard outputs
+    are concatenated in user order, so results do not depend on `workers`;
+    shard sketches are merged. Returns (rep_df, drift_df, explain_df,
+    sketches).
+    """
+    df = df.sort_values(by=["user_id", "day"]).reset_index(drop=True)
+    shards = [
+        (start, end)
+        for start, end in shard_bounds(key_codes(df["user_id"]), shard_size)
+        if end > start
+    ]
+
+    if not shards:
+        # No users: one pass over the empty frame gives empty outputs with
+        # the expected columns
+        results = [process_shard(df, config)]
+    elif workers <= 1 or len(shards) <= 1:
+        results = [process_shard(df.iloc[start:end], config) for start, end in shards]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(shards)),
+            initializer=_init_worker,
+            initargs=(df,),
+        ) as pool:
+            results = list(
+                pool.map(_process_range, shards, [config] * len(shards))
+            )
+
+    frames = tuple(
+        pd.concat([result[i] for result in results], ignore_index=True)
+        for i in range(3)
+    )
+    return frames + (QuantileSketches.merge([result[3] for result in results]),)
@@ -0,0 +1,224 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from .keys import key_codes
+
+
+# -----------------------------
+# Row bookkeeping
+# -----------------------------
+def group_positions(keys):
+    """Position of every row inside its (contiguous) group of equal keys"""
+    keys = np.asarray(keys)
+    n = len(keys)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    lengths = np.diff(np.r_[starts, n])
+
+    return np.arange(n) - np.repeat(starts, lengths)
+
+
+# -----------------------------
+# Window specs
+# -----------------------------
+# A window spec is (window, statistics): trailing window length in days and
+# the statistics computed over it. Output columns are named
+# "{feature}_{statistic}_{window}d"; the name is the column's metadata.
+REPRESENTATION_STATISTICS = ("mean", "std", "min", "max")
+
+COLUMN_PATTERN = re.compile(
+    rf"^(?P<feature>.+)_(?P<statistic>{'|'.join(REPRESENTATION_STATISTICS)})_(?P<window>\d+)d$"
+)
+
+
+def representation_column(feature, statistic, window):
+    return f"{feature}_{statistic}_{window}d"
+
+
+def parse_representation_column(column):
+    """(feature, statistic, window) of a representation column, or None"""
+    match = COLUMN_PATTERN.match(str(column))
+    if match is None:
+        return None
+    return match["feature"], match["statistic"], int(match["window"])
+
+
+def representation_columns(columns, statistics=None, windows=None):
+    """
+    Discover representation columns among `columns` (e.g. an artifact's).
+
+    Keeps the columns whose statistic / window is selected (None keeps all)
+    and returns (columns, labels). Labels are the bare feature names when
+    every feature appears once, and the column names otherwise.
+    """
+    selected = []
+    for column in columns:
+        parsed = parse_representation_column(column)
+        if parsed is None:
+            continue
+        _, statistic, window = parsed
+        if statistics is not None and statistic not in statistics:
+            continue
+        if windows is not None and window not in windows:
+            continue
+        selected.append((column, parsed[0]))
+
+    columns = [column for column, _ in selected]
+    features = [feature for _, feature in selected]
+    labels = features if len(set(features)) == len(features) else columns
+    return columns, labels
+
+
+# -----------------------------
+# Shared accumulators
+# -----------------------------
+class WindowAccumulators:
+    """
+    Per-row accumulators shared by every window over the same series.
+
+    Values are centered on their user's mean (and squares on their user's
+    mean square deviation) before taking prefix sums, so running totals
+    return to ~0 at every user boundary: windows never subtract large
+    unrelated totals, whatever the size of the frame. Sums and sums of
+    squares are then two differences per row; min / max come from a sparse
+    table of power-of-two blocks, two lookups per row for any window.
+    """
+
+    def __init__(self, values, positions):
+        values = np.asarray(values, dtype=np.float64)
+        starts = np.flatnonzero(positions == 0)
+        counts = np.diff(np.r_[starts, len(values)])
+        user_index = np.repeat(np.arange(len(starts)), counts)
+
+        # Per-row copies of the user's mean and mean square deviation
+        self.row_mean = (np.add.reduceat(values, starts, axis=0) / counts[:, None])[user_index]
+        deviation = values - self.row_mean
+        squares = deviation * deviation
+        self.row_square = (np.add.reduceat(squares, starts, axis=0) / counts[:, None])[user_index]
+
+        self.sums = self._prefix(deviation)
+        self.square_sums = self._prefix(squares - self.row_square)
+
+        self._values = values
+        self._tables = {}
+
+    @staticmethod
+    def _prefix(values):
+        prefix = np.zeros((len(values) + 1, values.shape[1]))
+        np.cumsum(values, axis=0, out=prefix[1:])
+        return prefix
+
+    def _level(self, reduce, level):
+        """
+        Reductions over blocks of 2**level rows. Only the highest level built
+        so far is kept; asking for windows in increasing order builds each
+        level once.
+        """
+        built, table = self._tables.get(reduce, (0, self._values))
+        if built > level:
+            built, table = 0, self._values
+
+        while built < level:
+            half = 1 << built
+            table = reduce(table[:-half], table[half:])
+            built += 1
+
+        self._tables[reduce] = (built, table)
+        return table
+
+    def window_stats(self, rows, window, statistics):
+        """
+        statistic -> (len(rows) x features) values of the windows ending at
+        `rows`. Every window ending at row >= window - 1 is computed with
+        contiguous slices, then the requested rows are picked once.
+        """
+        picks = rows - (window - 1)
+        results = {}
+
+        # Centered sum of each window; the mean adds the user mean back
+        sums = self.sums[window:] - self.sums[:-window]
+        if "mean" in statistics:
+            results["mean"] = (self.row_mean[window - 1:] + sums / window)[picks]
+
+        if "std" in statistics:
+            squares = (
+                self.square_sums[window:]
+                - self.square_sums[:-window]
+                + window * self.row_square[window - 1:]
+            )
+            # Sample std (ddof=1), as pandas
+            variance = (squares - sums * sums / window) / max(window - 1, 1)
+            results["std"] = np.sqrt(np.maximum(variance[picks], 0.0))
+
+        # Two overlapping power-of-two blocks cover each window
+        level = window.bit_length() - 1
+        offset = window - (1 << level)
+        for statistic, reduce in (("min", np.minimum), ("max", np.maximum)):
+            if statistic in statistics:
+                table = self._level(reduce, level)
+                results[statistic] = reduce(
+                    table[picks], table[picks + offset]
+                )
+
+        return results
+
+
+# -----------------------------
+# Representation builder
+# -----------------------------
+def build_representations(df, feature_columns, window_specs):
+    """
+    Rolling per-user feature statistics for a list of (window, statistics)
+    specs, computed in one pass over shared accumulators.
+
+    One row per user-day once the shortest window is full; columns of
+    longer windows are NaN until their own window fills.
+    """
+    df = df.sort_values(by=["user_id", "day"]).reset_index(drop=True)
+    positions = group_positions(key_codes(df["user_id"]))
+
+    shortest = min(window for window, _ in window_specs)
+    emitted = positions >= shortest - 1
+
+    rows = np.flatnonzero(emitted)
+    n_features = len(feature_columns)
+
+    # All outputs land in one preallocated column-major block (pandas' own
+    # layout), one slice per (window, statistic); no copy builds the frame
+    names = [
+        representation_column(feature, statistic, window)
+        for window, statistics in window_specs
+        for statistic in statistics
+        for feature in feature_columns
+    ]
+    out = np.full((len(names), len(rows)), np.nan)
+
+    if len(rows):
+        accumulators = WindowAccumulators(
+            df[feature_columns].to_numpy(dtype=np.float64), positions
+        )
+
+    starts = {}
+    for window, statistics in window_specs:
+        for statistic in statistics:
+            starts[window, statistic] = len(starts) * n_features
+
+    # Shortest windows first, so each sparse-table level is built once
+    for window, statistics in sorted(window_specs, key=lambda spec: spec[0]):
+        full = np.flatnonzero(positions[rows] >= window - 1)
+        if len(full) == 0:
+            continue
+
+        stats = accumulators.window_stats(rows[full], window, statistics)
+        for statistic in statistics:
+            start = starts[window, statistic]
+            out[start:start + n_features, full] = stats[statistic].T
+
+    rep_df = pd.DataFrame(out.T, columns=names, copy=False)
+    rep_df.insert(0, "day", df["day"].to_numpy(dtype=np.int64)[rows])
+    rep_df.insert(0, "user_id", df["user_id"].array[rows])
+    return rep_df
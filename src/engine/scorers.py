@@ -0,0 +1,390 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# -----------------------------
+# Configuration
+# -----------------------------
+# Scored rows are handed to the window-based kernels in batches of this many
+# rows, which bounds the stacked (rows x features x days) arrays
+SCORING_BATCH_ROWS = 32_768
+
+# Histogram kernels: bins per feature and the probability floor that keeps
+# empty bins finite in the log terms
+HISTOGRAM_BINS = 10
+HISTOGRAM_FLOOR = 1e-4
+
+# Mahalanobis: shrinkage of the reference covariance toward its diagonal,
+# so short or collinear windows still give a well-conditioned inverse
+MAHALANOBIS_SHRINKAGE = 0.1
+
+
+# -----------------------------
+# Per-user prefix sums
+# -----------------------------
+def stack_users(values, positions):
+    """
+    Scatter grouped rows into a dense (users x days x features) array.
+
+    Rows must be grouped by user and ordered in time, with `positions` giving
+    the index of each row inside its user. Returns the dense array and the
+    user index of every row.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    user_index = np.cumsum(positions == 0) - 1
+
+    n_users = int(user_index[-1]) + 1 if len(user_index) else 0
+    max_len = int(positions.max()) + 1 if len(positions) else 0
+
+    dense = np.zeros((n_users, max_len, values.shape[1]))
+    dense[user_index, positions] = values
+
+    return dense, user_index
+
+
+def prefix_sums(dense):
+    """Running totals along the time axis, with a leading zero row per user"""
+    prefix = np.zeros((dense.shape[0], dense.shape[1] + 1, dense.shape[2]))
+    np.cumsum(dense, axis=1, out=prefix[:, 1:])
+    return prefix
+
+
+# -----------------------------
+# Running moments
+# -----------------------------
+def reference_moments(dense, lengths, users, ends, window):
+    """
+    Mean and sample std (ddof=1) of the `window` days ending at day `ends`
+    of user `users`, for every row (`lengths`: days of history per user).
+
+    A sliding Welford accumulator steps through time once, updating every
+    user's running mean / sum of squared deviations with vectorized adds
+    and removes, so no large running totals are ever subtracted. Series are
+    centered on each user's mean first and the accumulator is re-seeded
+    exactly once per window length, which keeps rounding small next to the
+    spread. The moments of each window are picked up when it is complete.
+    """
+    n_users, n_days, n_features = dense.shape
+    user_mean = dense.sum(axis=1) / np.maximum(lengths, 1)[:, None]
+    mean = np.zeros((n_users, n_features))
+    m2 = np.zeros((n_users, n_features))
+
+    mu = np.empty((len(users), n_features))
+    m2_rows = np.empty((len(users), n_features))
+
+    # Rows grouped by the step at which their window completes
+    order = np.argsort(ends, kind="stable")
+    bounds = np.searchsorted(ends[order], np.arange(n_days + 1))
+    steps = int(ends.max()) + 1 if len(ends) else 0
+
+    for t in range(steps):
+        x = dense[:, t] - user_mean
+        if t < window:
+            delta = x - mean
+            mean += delta / (t + 1)
+            m2 += delta * (x - mean)
+        elif (t + 1) % window == 0:
+            # Re-seed from the window itself (two-pass) once per window
+            # length, so rounding from adds / removes never piles up
+            block = dense[:, t + 1 - window:t + 1] - user_mean[:, None]
+            mean = block.mean(axis=1)
+            m2 = ((block - mean[:, None]) ** 2).sum(axis=1)
+        else:
+            old = dense[:, t - window] - user_mean
+            delta = x - old
+            new_mean = mean + delta / window
+            m2 += delta * (x - new_mean + old - mean)
+            mean = new_mean
+
+        rows = order[bounds[t]:bounds[t + 1]]
+        if len(rows):
+            mu[rows] = mean[users[rows]] + user_mean[users[rows]]
+            m2_rows[rows] = m2[users[rows]]
+
+    return mu, np.sqrt(np.maximum(m2_rows, 0.0) / max(window - 1, 1))
+
+
+# -----------------------------
+# Scored windows
+# -----------------------------
+class ScoringWindows:
+    """
+    Reference and current windows of every scored row, over a dense
+    (users x days x features) history.
+
+    Row i's current window is the `current_window` days ending at day
+    `ends[i]` of user `users[i]`; its reference window is the
+    `reference_window` days right before. Means come from shared prefix
+    sums, reference moments from the running accumulator, and the raw
+    windows are stacked in bounded batches for the distribution kernels.
+    """
+
+    def __init__(self, dense, lengths, users, ends, reference_window, current_window):
+        self.dense = dense
+        self.lengths = lengths
+        self.users = users
+        self.ends = ends
+        self.reference_window = reference_window
+        self.current_window = current_window
+        self._means = None
+
+    @classmethod
+    def from_positions(cls, dense, user_index, positions, reference_window, current_window):
+        """
+        Windows of every row with enough history (see stack_users); returns
+        (windows, boolean mask of scored rows).
+        """
+        valid = positions >= reference_window + current_window - 1
+        windows = cls(
+            dense,
+            np.bincount(user_index, minlength=len(dense)),
+            user_index[valid],
+            positions[valid],
+            reference_window,
+            current_window,
+        )
+        return windows, valid
+
+    @classmethod
+    def from_history(cls, history, reference_window):
+        """Windows of rows whose (rows x days x features) history is at hand"""
+        n_rows, n_days, _ = history.shape
+        return cls(
+            history,
+            np.full(n_rows, n_days),
+            np.arange(n_rows),
+            np.full(n_rows, n_days - 1),
+            reference_window,
+            n_days - reference_window,
+        )
+
+    def __len__(self):
+        return len(self.users)
+
+    def means(self):
+        """(mu_ref, mu_cur): two prefix-sum differences per row"""
+        if self._means is None:
+            prefix = prefix_sums(self.dense)
+            end = self.ends + 1
+            split = end - self.current_window
+            start = split - self.reference_window
+
+            self._means = (
+                (prefix[self.users, split] - prefix[self.users, start]) / self.reference_window,
+                (prefix[self.users, end] - prefix[self.users, split]) / self.current_window,
+            )
+        return self._means
+
+    def reference_moments(self):
+        """(mu_ref, sigma_ref) from the running accumulator"""
+        return reference_moments(
+            self.dense,
+            self.lengths,
+            self.users,
+            self.ends - self.current_window,
+            self.reference_window,
+        )
+
+    def batches(self, batch_rows=SCORING_BATCH_ROWS):
+        """
+        Yield (rows, reference, current): a slice of rows and their windows
+        stacked as (batch x features x days) arrays.
+        """
+        if len(self) == 0:
+            return
+
+        span = self.reference_window + self.current_window
+        view = sliding_window_view(self.dense, span, axis=1)
+        starts = self.ends - span + 1
+
+        for first in range(0, len(self), batch_rows):
+            rows = slice(first, min(first + batch_rows, len(self)))
+            stacked = view[self.users[rows], starts[rows]]
+            yield rows, stacked[..., :self.reference_window], stacked[..., self.reference_window:]
+
+
+# -----------------------------
+# Shared kernels
+# -----------------------------
+def l2_drift(mu_ref, mu_cur, epsilon):
+    """Normalized L2 distance between window means, one score per row"""
+    return np.linalg.norm(mu_cur - mu_ref, axis=1) / (
+        np.linalg.norm(mu_ref, axis=1) + epsilon
+    )
+
+
+def relative_contributions(mu_ref, mu_cur, epsilon):
+    """Per-feature relative change of the current mean against the reference"""
+    return (mu_cur - mu_ref) / (np.abs(mu_ref) + epsilon)
+
+
+def z_scores(mu_ref, sigma_ref, mu_cur, epsilon):
+    """Signed per-feature z-scores of the current mean against the reference"""
+    return (mu_cur - mu_ref) / (sigma_ref + epsilon)
+
+
+def bin_counts(values, edges):
+    """
+    Histogram counts of (... x days) values over per-row (... x edges) bin
+    edges: bin k holds edges[k-1] <= v < edges[k]. Returns (... x edges + 1).
+    """
+    below = (values[..., None, :] < edges[..., :, None]).sum(axis=-1)
+    n = values.shape[-1]
+    return np.diff(below, prepend=0, append=n, axis=-1)
+
+
+def histogram_probabilities(counts):
+    """Bin probabilities with empty bins raised to HISTOGRAM_FLOOR"""
+    return np.maximum(counts / counts.sum(axis=-1, keepdims=True), HISTOGRAM_FLOOR)
+
+
+def _per_feature(windows, epsilon, kernel):
+    """
+    Run a per-feature distance kernel over all batches; the score is the
+    mean over features and each contribution is the feature's distance,
+    signed by the direction of its mean change.
+    """
+    mu_ref, mu_cur = windows.means()
+    distances = np.empty(mu_ref.shape)
+
+    for rows, reference, current in windows.batches():
+        distances[rows] = kernel(reference, current, mu_ref[rows], epsilon)
+
+    return distances.mean(axis=1), np.sign(mu_cur - mu_ref) * distances
+
+
+# -----------------------------
+# Scorers
+# -----------------------------
+# Every scorer maps ScoringWindows to (scores, contributions): one score per
+# row and one signed contribution per row and feature, ranked for the
+# explanations.
+def score_l2(windows, epsilon):
+    """Normalized L2 distance of window means; contributions are relative changes"""
+    mu_ref, mu_cur = windows.means()
+    return l2_drift(mu_ref, mu_cur, epsilon), relative_contributions(mu_ref, mu_cur, epsilon)
+
+
+def score_zscore(windows, epsilon):
+    """Mean |z| of the current mean against the reference mean / std"""
+    _, mu_cur = windows.means()
+    mu_ref, sigma_ref = windows.reference_moments()
+    z = z_scores(mu_ref, sigma_ref, mu_cur, epsilon)
+    return np.abs(z).mean(axis=1), z
+
+
+def score_mahalanobis(windows, epsilon):
+    """
+    Mahalanobis distance of the current mean under each row's own reference
+    covariance (shrunk toward its diagonal). A feature's contribution is its
+    share of the squared distance, delta_f * (S^-1 delta)_f / d, signed by
+    the direction of its change.
+    """
+    mu_ref, mu_cur = windows.means()
+    delta = mu_cur - mu_ref
+    scores = np.empty(len(windows))
+    contributions = np.empty(delta.shape)
+    eye = np.eye(delta.shape[1])
+
+    for rows, reference, _ in windows.batches():
+        centered = reference - reference.mean(axis=-1, keepdims=True)
+        covariance = np.einsum("bfd,bgd->bfg", centered, centered) / max(
+            windows.reference_window - 1, 1
+        )
+        diagonal = covariance * eye
+        covariance = (1 - MAHALANOBIS_SHRINKAGE) * covariance + MAHALANOBIS_SHRINKAGE * diagonal
+        covariance += epsilon * eye
+
+        solved = np.linalg.solve(covariance, delta[rows, :, None])[..., 0]
+        shares = delta[rows] * solved
+        distance = np.sqrt(np.maximum(shares.sum(axis=1), 0.0))
+
+        scores[rows] = distance
+        contributions[rows] = np.sign(delta[rows]) * np.abs(shares) / (distance[:, None] + epsilon)
+
+    return scores, contributions
+
+
+def _jensen_shannon(reference, current, mu_ref, epsilon):
+    """Base-2 JS divergence (0..1) of equal-width histograms over both windows"""
+    both = np.concatenate([reference, current], axis=-1)
+    low = both.min(axis=-1, keepdims=True)
+    high = both.max(axis=-1, keepdims=True)
+    edges = low + (high - low) * np.arange(1, HISTOGRAM_BINS) / HISTOGRAM_BINS
+
+    p = histogram_probabilities(bin_counts(reference, edges))
+    q = histogram_probabilities(bin_counts(current, edges))
+    m = (p + q) / 2
+    return 0.5 * (p * np.log2(p / m)).sum(axis=-1) + 0.5 * (q * np.log2(q / m)).sum(axis=-1)
+
+
+def _wasserstein(reference, current, mu_ref, epsilon):
+    """
+    Wasserstein-1 between the two empirical windows, relative to |mu_ref|.
+
+    Both windows are sorted together; the distance is the area between
+    their CDFs, accumulated over the gaps between consecutive values.
+    """
+    n_ref, n_cur = reference.shape[-1], current.shape[-1]
+    both = np.concatenate([reference, current], axis=-1)
+    steps = np.concatenate([np.full(n_ref, 1 / n_ref), np.full(n_cur, -1 / n_cur)])
+
+    order = np.argsort(both, axis=-1, kind="stable")
+    values = np.take_along_axis(both, order, axis=-1)
+    cdf_gap = np.cumsum(steps[order], axis=-1)[..., :-1]
+
+    distance = (np.abs(cdf_gap) * np.diff(values, axis=-1)).sum(axis=-1)
+    return distance / (np.abs(mu_ref) + epsilon)
+
+
+def _psi(reference, current, mu_ref, epsilon):
+    """Population stability index over the reference window's quantile bins"""
+    # Linear-interpolated quantiles (np.quantile's default) read off the
+    # sorted windows at fixed positions, as every row has the same length
+    position = np.arange(1, HISTOGRAM_BINS) / HISTOGRAM_BINS * (reference.shape[-1] - 1)
+    lower = np.floor(position).astype(np.intp)
+    upper = np.minimum(lower + 1, reference.shape[-1] - 1)
+    ordered = np.sort(reference, axis=-1)
+    edges = ordered[..., lower] + (position - lower) * (
+        ordered[..., upper] - ordered[..., lower]
+    )
+
+    p = histogram_probabilities(bin_counts(reference, edges))
+    q = histogram_probabilities(bin_counts(current, edges))
+    return ((q - p) * np.log(q / p)).sum(axis=-1)
+
+
+def score_jensen_shannon(windows, epsilon):
+    """Mean per-feature Jensen-Shannon divergence of binned windows"""
+    return _per_feature(windows, epsilon, _jensen_shannon)
+
+
+def score_wasserstein(windows, epsilon):
+    """Mean per-feature Wasserstein-1 distance of the sorted windows"""
+    return _per_feature(windows, epsilon, _wasserstein)
+
+
+def score_psi(windows, epsilon):
+    """Mean per-feature population stability index"""
+    return _per_feature(windows, epsilon, _psi)
+
+
+# -----------------------------
+# Registry
+# -----------------------------
+SCORERS = {
+    "l2": score_l2,
+    "zscore": score_zscore,
+    "mahalanobis": score_mahalanobis,
+    "jensen_shannon": score_jensen_shannon,
+    "wasserstein": score_wasserstein,
+    "psi": score_psi,
+}
+
+SCORING_MODES = tuple(SCORERS)
+
+
+def get_scorer(mode):
+    """The scorer registered under `mode`"""
+    if mode not in SCORERS:
+        raise ValueError(f"Unknown scoring mode: {mode} (expected one of {SCORING_MODES})")
+    return SCORERS[mode]
@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+
+from .keys import key_codes
+from .representation import group_positions
+from .scorers import ScoringWindows, get_scorer, stack_users
+
+
+# -----------------------------
+# Explanation kernels
+# -----------------------------
+def top_k_features(contributions, k):
+    """Column indices of the k largest |contributions| per row, strongest first"""
+    magnitude = np.abs(contributions)
+    k = min(k, magnitude.shape[1])
+
+    top = np.argpartition(-magnitude, k - 1, axis=1)[:, :k]
+    order = np.argsort(
+        -np.take_along_axis(magnitude, top, axis=1), axis=1, kind="stable"
+    )
+
+    return np.take_along_axis(top, order, axis=1)
+
+
+# -----------------------------
+# Output frames
+# -----------------------------
+def score_frames(user_ids, days, scores, contributions, feature_labels, top_k):
+    """(drift_df, explain_df) for scored rows given their per-feature contributions"""
+    drift_df = pd.DataFrame({
+        "user_id": user_ids,
+        "day": days,
+        "drift_score": scores,
+    })
+
+    # Strongest feature contributions behind each score
+    top = top_k_features(contributions, top_k)
+
+    k = top.shape[1]
+    rows = np.repeat(np.arange(len(top)), k)
+    cols = top.ravel()
+    values = contributions[rows, cols]
+
+    # Features and directions are emitted as categoricals (sorted names)
+    labels = np.asarray(feature_labels, dtype=object)
+    order = np.argsort(labels)
+    label_codes = np.empty(len(labels), dtype=np.int32)
+    label_codes[order] = np.arange(len(labels))
+
+    explain_df = pd.DataFrame({
+        "user_id": user_ids[rows],
+        "day": days[rows],
+        "feature": pd.Categorical.from_codes(label_codes[cols], labels[order]),
+        "contribution": values,
+        "direction": pd.Categorical.from_codes(
+            (values > 0).astype(np.int8), ["decrease", "increase"]
+        ),
+    })
+
+    return drift_df, explain_df
+
+
+# -----------------------------
+# Fused scoring stage
+# -----------------------------
+def score_representations(
+    rep_df,
+    feature_columns,
+    feature_labels,
+    reference_window,
+    current_window,
+    epsilon,
+    top_k,
+    mode="l2",
+):
+    """
+    Drift scores and top-K feature explanations from one set of reference /
+    current windows, scored with any registered scorer (engine.scorers).
+
+    Returns (drift_df, explain_df) with the same rows and ordering as the
+    former compute_drift.py / explain_drift.py outputs. Rows whose scored
+    columns are not filled yet (windows longer than the shortest one) are
+    skipped, so each user's history starts where all scored windows are full.
+    """
+    rep_df = rep_df[["user_id", "day", *feature_columns]]
+    complete = rep_df[feature_columns].notna().all(axis=1)
+    if not complete.all():
+        rep_df = rep_df[complete]
+    rep_df = rep_df.sort_values(by=["user_id", "day"]).reset_index(drop=True)
+    positions = group_positions(key_codes(rep_df["user_id"]))
+
+    scorer = get_scorer(mode)
+
+    dense, user_index = stack_users(
+        rep_df[feature_columns].to_numpy(dtype=np.float64), positions
+    )
+    windows, scored = ScoringWindows.from_positions(
+        dense, user_index, positions, reference_window, current_window
+    )
+    scores, contributions = scorer(windows, epsilon)
+
+    return score_frames(
+        rep_df["user_id"].array[scored],
+        rep_df["day"].to_numpy(dtype=np.int64)[scored],
+        scores,
+        contributions,
+        feature_labels,
+        top_k,
+    )
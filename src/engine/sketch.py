@@ -0,0 +1,356 @@
+import os
+from pathlib import Path
+
+import numpy as np
+
+from .keys import key_codes, key_positions, offset_table
+
+# -----------------------------
+# Configuration
+# -----------------------------
+# t-digest compression (delta): each sketch keeps at most COMPRESSION / 2 + 1
+# centroids, finest in the tails, whatever the number of values added
+COMPRESSION = 100
+
+# Users are grouped into cohorts by the day they were first seen, in
+# blocks of COHORT_DAYS (cohort = first day of the block)
+COHORT_DAYS = 30
+
+SCORE_METRIC = "drift_score"
+
+
+# -----------------------------
+# Compression kernel
+# -----------------------------
+def _compress(groups, means, weights, n_groups):
+    """
+    Merge weighted points into t-digest centroids, for every group at once.
+
+    Points are sorted by (group, value) and each is assigned to the k-scale
+    bucket (k = delta / 2pi * asin(2q - 1)) of its mid quantile inside its
+    group; each (group, bucket) becomes one centroid. Returns (offsets,
+    means, weights, minima, maxima) with the centroids of group g in
+    offsets[g]:offsets[g+1]; groups must all be non-empty.
+    """
+    order = np.lexsort((means, groups))
+    groups, means, weights = groups[order], means[order], weights[order]
+
+    cumulative = np.cumsum(weights)
+    _, bounds = offset_table(groups)
+    before = np.r_[0.0, cumulative][bounds[:-1]]
+    totals = np.r_[0.0, cumulative][bounds[1:]] - before
+
+    group_rows = np.repeat(np.arange(len(bounds) - 1), np.diff(bounds))
+    mid = (cumulative - weights / 2 - before[group_rows]) / totals[group_rows]
+    bucket = np.floor(COMPRESSION / (2 * np.pi) * np.arcsin(2 * mid - 1))
+
+    starts = np.flatnonzero(
+        np.r_[True, (groups[1:] != groups[:-1]) | (bucket[1:] != bucket[:-1])]
+    )
+    centroid_weights = np.add.reduceat(weights, starts)
+    centroid_means = np.add.reduceat(weights * means, starts) / centroid_weights
+
+    counts = np.bincount(groups[starts], minlength=n_groups)
+    return (
+        np.r_[0, np.cumsum(counts)].astype(np.int64),
+        centroid_means,
+        centroid_weights,
+        means[bounds[:-1]],
+        means[bounds[1:] - 1],
+    )
+
+
+# -----------------------------
+# Sketch set
+# -----------------------------
+class QuantileSketches:
+    """
+    Mergeable quantile sketches (merging t-digests) keyed by (metric, day,
+    cohort).
+
+    Centroids of all sketches live in flat arrays with per-sketch offsets,
+    so building, merging and compressing touch every sketch in one pass.
+    Memory depends on the number of keys, never on the number of values.
+    """
+
+    def __init__(self, metrics, days, cohorts, offsets, means, weights, minima, maxima):
+        self.metrics = np.asarray(metrics, dtype=str)  # one name per sketch
+        self.days = np.asarray(days, dtype=np.int64)
+        self.cohorts = np.asarray(cohorts, dtype=np.int64)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.means = np.asarray(means, dtype=np.float64)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.minima = np.asarray(minima, dtype=np.float64)
+        self.maxima = np.asarray(maxima, dtype=np.float64)
+
+        self.positions = {
+            key: i
+            for i, key in enumerate(
+                zip(self.metrics.tolist(), self.days.tolist(), self.cohorts.tolist())
+            )
+        }
+
+    def __len__(self):
+        return len(self.days)
+
+    @property
+    def nbytes(self):
+        return sum(
+            array.nbytes
+            for array in (
+                self.metrics, self.days, self.cohorts, self.offsets,
+                self.means, self.weights, self.minima, self.maxima,
+            )
+        )
+
+    # -------------------------
+    # Construction
+    # -------------------------
+    @classmethod
+    def from_points(cls, metrics, days, cohorts, values, weights=None):
+        """
+        Sketches of weighted points. `metrics` is one name for every point
+        or one per point; `days` and `cohorts` give each point's key. NaN
+        values are skipped.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        weights = np.ones(len(values)) if weights is None else np.asarray(weights, dtype=np.float64)
+        days = np.broadcast_to(np.asarray(days, dtype=np.int64), values.shape)
+        cohorts = np.broadcast_to(np.asarray(cohorts, dtype=np.int64), values.shape)
+
+        metrics = np.asarray(metrics, dtype=str)
+        if metrics.ndim == 0:
+            metric_names = metrics[None]
+            metric_codes = np.zeros(len(values), dtype=np.int64)
+        else:
+            metric_names, metric_codes = np.unique(metrics, return_inverse=True)
+
+        keep = ~np.isnan(values)
+        if not keep.all():
+            metric_codes, days, cohorts = metric_codes[keep], days[keep], cohorts[keep]
+            values, weights = values[keep], weights[keep]
+        if len(values) == 0:
+            return cls.empty()
+
+        # (metric, day, cohort) packed into one integer key per point
+        day_base, cohort_base = days.min(), cohorts.min()
+        n_days = int(days.max() - day_base) + 1
+        n_cohorts = int(cohorts.max() - cohort_base) + 1
+        packed = (metric_codes * n_days + (days - day_base)) * n_cohorts + (cohorts - cohort_base)
+        present, groups = np.unique(packed, return_inverse=True)
+
+        offsets, means, centroid_weights, minima, maxima = _compress(
+            groups, values, weights, len(present)
+        )
+        return cls(
+            metric_names[present // (n_days * n_cohorts)],
+            present // n_cohorts % n_days + day_base,
+            present % n_cohorts + cohort_base,
+            offsets, means, centroid_weights, minima, maxima,
+        )
+
+    @classmethod
+    def empty(cls):
+        return cls([], [], [], [0], [], [], [], [])
+
+    def _centroid_keys(self):
+        counts = np.diff(self.offsets)
+        return (
+            np.repeat(self.metrics, counts),
+            np.repeat(self.days, counts),
+            np.repeat(self.cohorts, counts),
+        )
+
+    @classmethod
+    def merge(cls, sketches):
+        """One sketch set holding every input's points; equal keys are combined"""
+        sketches = [s for s in sketches if len(s)]
+        if not sketches:
+            return cls.empty()
+
+        parts = [s._centroid_keys() for s in sketches]
+        merged = cls.from_points(
+            np.concatenate([p[0] for p in parts]),
+            np.concatenate([p[1] for p in parts]),
+            np.concatenate([p[2] for p in parts]),
+            np.concatenate([s.means for s in sketches]),
+            np.concatenate([s.weights for s in sketches]),
+        )
+
+        # Extremes are exact: combine the inputs' rather than the centroids'
+        for s in sketches:
+            rows = np.array([merged.positions[key] for key in s.positions])
+            np.minimum.at(merged.minima, rows, s.minima)
+            np.maximum.at(merged.maxima, rows, s.maxima)
+
+        return merged
+
+    def select(self, metric, day, cohort=None):
+        """
+        (means, weights, minimum, maximum) of one sketch; without a cohort,
+        every cohort's sketch for the day merged. None if there is no data.
+        """
+        if cohort is not None:
+            i = self.positions.get((metric, day, cohort))
+            if i is None:
+                return None
+            lo, hi = self.offsets[i], self.offsets[i + 1]
+            return self.means[lo:hi], self.weights[lo:hi], self.minima[i], self.maxima[i]
+
+        rows = np.flatnonzero((self.metrics == metric) & (self.days == day))
+        if len(rows) == 0:
+            return None
+        if len(rows) == 1:
+            return self.select(metric, day, int(self.cohorts[rows[0]]))
+
+        parts = [np.arange(self.offsets[i], self.offsets[i + 1]) for i in rows]
+        centroids = np.concatenate(parts)
+        _, means, weights, _, _ = _compress(
+            np.zeros(len(centroids), dtype=np.int64),
+            self.means[centroids],
+            self.weights[centroids],
+            1,
+        )
+        return means, weights, self.minima[rows].min(), self.maxima[rows].max()
+
+    # -------------------------
+    # Queries
+    # -------------------------
+    @staticmethod
+    def _curve(means, weights, minimum, maximum):
+        """(cumulative weight, value) points the CDF is interpolated through"""
+        cumulative = np.cumsum(weights) - weights / 2
+        total = weights.sum()
+        positions = np.r_[0.0, cumulative, total] / total
+        values = np.r_[minimum, means, maximum]
+        return positions, values
+
+    def quantiles(self, metric, day, qs, cohort=None):
+        """Values at quantiles `qs` (0-1), or None if there is no data"""
+        found = self.select(metric, day, cohort)
+        if found is None:
+            return None
+        positions, values = self._curve(*found)
+        return np.interp(np.asarray(qs, dtype=np.float64), positions, values)
+
+    def ranks(self, metric, day, xs, cohort=None):
+        """Fraction of the population at or below each of `xs` (0-1), or None"""
+        found = self.select(metric, day, cohort)
+        if found is None:
+            return None
+        positions, values = self._curve(*found)
+        return np.interp(np.asarray(xs, dtype=np.float64), values, positions)
+
+    def latest_day(self, metric):
+        """Last day with a sketch of `metric`, or None"""
+        days = self.days[self.metrics == metric]
+        return int(days.max()) if len(days) else None
+
+    def count(self, metric, day, cohort=None):
+        found = self.select(metric, day, cohort)
+        return 0.0 if found is None else float(found[1].sum())
+
+    # -------------------------
+    # Persistence
+    # -------------------------
+    def to_arrays(self):
+        return {
+            "metrics": self.metrics,
+            "days": self.days,
+            "cohorts": self.cohorts,
+            "offsets": self.offsets,
+            "means": self.means,
+            "weights": self.weights,
+            "minima": self.minima,
+            "maxima": self.maxima,
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        return cls(**{name: arrays[name] for name in (
+            "metrics", "days", "cohorts", "offsets",
+            "means", "weights", "minima", "maxima",
+        )})
+
+
+def save_sketches(sketches, path):
+    """Write a sketch set as one .npz, replacing any previous copy"""
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **sketches.to_arrays())
+    os.replace(tmp_path, path)
+
+
+def load_sketches(path):
+    with np.load(path, allow_pickle=False) as npz:
+        return QuantileSketches.from_arrays(npz)
+
+
+# -----------------------------
+# Population sketches
+# -----------------------------
+def user_cohorts(df):
+    """(users, cohorts): signup cohort of every user from their first day seen"""
+    df = df.sort_values(by=["user_id", "day"], kind="stable")
+    _, offsets = offset_table(key_codes(df["user_id"]))
+    users = np.asarray(df["user_id"].array[offsets[:-1]]).astype(str)
+    first_days = df["day"].to_numpy(dtype=np.int64)[offsets[:-1]]
+    return users, first_days - first_days % COHORT_DAYS
+
+
+def add_cohorts(users, cohorts, day_df):
+    """
+    (users, cohorts) extended with the users of one day's rows that were
+    never seen before; their cohort is the block holding that day.
+    """
+    day_users = np.unique(np.asarray(day_df["user_id"]).astype(str))
+    new_users = np.setdiff1d(day_users, users)
+    if len(new_users) == 0:
+        return users, cohorts
+
+    first_day = int(day_df["day"].min())
+    all_users = np.union1d(users, new_users)
+    all_cohorts = np.empty(len(all_users), dtype=np.int64)
+    all_cohorts[np.searchsorted(all_users, users)] = cohorts
+    all_cohorts[np.searchsorted(all_users, new_users)] = first_day - first_day % COHORT_DAYS
+    return all_users, all_cohorts
+
+
+def cohort_sketches(df, drift_df, feature_columns, users, cohorts):
+    """
+    Sketches of every raw feature (by day of the behavior row) and of drift
+    scores (by scored day), per day and signup cohort, for known cohorts.
+    """
+    row_cohorts = cohorts[key_positions(df["user_id"], users)]
+    days = df["day"].to_numpy(dtype=np.int64)
+
+    # One metric at a time keeps the working set at one column
+    parts = [
+        QuantileSketches.from_points(
+            feature, days, row_cohorts, df[feature].to_numpy(dtype=np.float64)
+        )
+        for feature in feature_columns
+    ]
+
+    score_users = key_positions(drift_df["user_id"], users)
+    parts.append(QuantileSketches.from_points(
+        SCORE_METRIC,
+        drift_df["day"].to_numpy(dtype=np.int64),
+        cohorts[score_users],
+        drift_df["drift_score"].to_numpy(dtype=np.float64),
+    ))
+
+    return QuantileSketches.merge(parts)
+
+
+def population_sketches(df, drift_df, feature_columns):
+    """
+    Sketches of `df` and `drift_df` with cohorts taken from `df` itself.
+
+    `df` must hold each user's full history so cohorts are final; sketches
+    of disjoint user groups (shards, chunks) merge into the full population.
+    """
+    users, cohorts = user_cohorts(df)
+    return cohort_sketches(df, drift_df, feature_columns, users, cohorts)
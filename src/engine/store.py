@@ -0,0 +1,163 @@
+import os
+import shutil
+import time
+from pathlib import Path
+
+import numpy as np
+
+from .keys import key_names, key_offsets
+
+# -----------------------------
+# Layout
+# -----------------------------
+# Every array is a plain .npy file so workers can open it with mmap_mode="r"
+# and share one copy through the page cache.
+STORE_ARRAYS = {
+    "users": None,                       # sorted user ids (fixed-width str)
+    "offsets": np.int64,                 # len(users) + 1 row offsets
+    "days": np.int32,
+    "scores": np.float32,
+    "explain_users": None,
+    "explain_offsets": np.int64,
+    "explain_days": np.int32,
+    "explain_feature_codes": np.int16,
+    "explain_feature_names": None,
+    "explain_contributions": np.float32,
+    "explain_direction_codes": np.int16,
+    "explain_direction_names": None,
+    "leaderboard_stats": np.float64,     # len(users) x LEADERBOARD_STATS
+    "leaderboard_latest_days": np.int32,
+    "leaderboard_order": np.int32,       # ascending rank order per stat
+    "leaderboard_ranked": np.float64,    # stats in that order
+    "onset_days": np.int32,              # per user, -1 without sustained drift
+}
+
+# Each write goes to a fresh <directory>/<version>/ subdirectory; CURRENT
+# names the complete version readers should open and is swapped with one
+# atomic rename once every array is in place, so a reader never sees arrays
+# from two writes
+CURRENT_FILE = "CURRENT"
+
+# Versions kept besides the current one, so a reader that resolved CURRENT
+# just before a swap can still open the arrays it points to
+KEEP_VERSIONS = 1
+
+
+# -----------------------------
+# Helpers
+# -----------------------------
+def _write_version(directory, arrays):
+    """Save every array into a new version directory and return its name"""
+    version = format(time.time_ns(), "x")
+    tmp_dir = directory / f".{version}.tmp"
+    tmp_dir.mkdir()
+
+    for name, dtype in STORE_ARRAYS.items():
+        array = arrays[name] if dtype is None else arrays[name].astype(dtype)
+        with open(tmp_dir / f"{name}.npy", "wb") as f:
+            np.save(f, array)
+
+    os.replace(tmp_dir, directory / version)
+    return version
+
+
+def _publish(directory, version):
+    """Point CURRENT at `version`, then drop all but the newest older ones"""
+    tmp_path = directory / f".{CURRENT_FILE}.tmp"
+    tmp_path.write_text(version)
+    os.replace(tmp_path, directory / CURRENT_FILE)
+
+    # Version names are hex timestamps of equal width, so they sort by age
+    older = sorted(
+        path.name for path in directory.iterdir()
+        if path.is_dir() and not path.name.startswith(".") and path.name < version
+    )
+    for name in older[:len(older) - KEEP_VERSIONS]:
+        shutil.rmtree(directory / name, ignore_errors=True)
+
+    # Arrays of the earlier flat layout (one set directly in the directory)
+    for path in [*directory.glob("*.npy"), directory / "VERSION"]:
+        path.unlink(missing_ok=True)
+
+
+# -----------------------------
+# Writer
+# -----------------------------
+def write_score_store(directory, drift_df, explain_df, leaderboard, onset_days):
+    """
+    Persist drift scores, explanations, the per-user leaderboard
+    (engine.leaderboard.Leaderboard) and onset days (engine.onset), all built
+    from the same scores, as fixed-width per-user arrays.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    drift_df = drift_df.sort_values(by=["user_id", "day"], kind="stable")
+    explain_df = explain_df.sort_values(by=["user_id", "day"], kind="stable")
+
+    # Key columns are compared and stored as their categorical codes
+    users, offsets = key_offsets(drift_df["user_id"])
+    explain_users, explain_offsets = key_offsets(explain_df["user_id"])
+    feature_names, feature_codes = key_names(explain_df["feature"])
+    direction_names, direction_codes = key_names(explain_df["direction"])
+
+    arrays = {
+        "users": users,
+        "offsets": offsets,
+        "days": drift_df["day"].to_numpy(),
+        "scores": drift_df["drift_score"].to_numpy(),
+        "explain_users": explain_users,
+        "explain_offsets": explain_offsets,
+        "explain_days": explain_df["day"].to_numpy(),
+        "explain_feature_codes": feature_codes,
+        "explain_feature_names": feature_names,
+        "explain_contributions": explain_df["contribution"].to_numpy(),
+        "explain_direction_codes": direction_codes,
+        "explain_direction_names": direction_names,
+        "leaderboard_stats": leaderboard.stats,
+        "leaderboard_latest_days": leaderboard.latest_days,
+        "leaderboard_order": leaderboard.order,
+        "leaderboard_ranked": leaderboard.ranked,
+        "onset_days": onset_days,
+    }
+
+    _publish(directory, _write_version(directory, arrays))
+    return directory
+
+
+def remove_score_store(directory):
+    """Delete a store, e.g. before a run that will not finish for a while"""
+    directory = Path(directory)
+
+    # Unpublish first so readers stop resolving it before files disappear
+    (directory / CURRENT_FILE).unlink(missing_ok=True)
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+# -----------------------------
+# Reader
+# -----------------------------
+def store_version(directory):
+    """Version currently published in a store, or None without one"""
+    path = Path(directory) / CURRENT_FILE
+    try:
+        return path.read_text().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def store_exists(directory):
+    version = store_version(directory)
+    return version is not None and (Path(directory) / version).is_dir()
+
+
+def open_score_store(directory, version=None):
+    """
+    Read-only memory maps of every array of one version (default: the
+    current one), keyed by name. All arrays come from the same write.
+    """
+    directory = Path(directory) / (version or store_version(directory))
+    return {
+        name: np.load(directory / f"{name}.npy", mmap_mode="r")
+        for name in STORE_ARRAYS
+    }
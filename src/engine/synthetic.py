@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+
+# -----------------------------
+# Feature definitions
+# -----------------------------
+# name -> (baseline low, baseline high); order matches the output columns
+BASELINE_RANGES = {
+    "session_count": (2, 6),
+    "avg_session_duration": (8, 18),
+    "active_hours_entropy": (0.3, 0.6),
+    "action_type_entropy": (0.4, 0.7),
+    "inter_day_variability": (0.05, 0.15),
+}
+
+FEATURES = list(BASELINE_RANGES)
+DRIFTABLE = FEATURES[:4]  # inter_day_variability is derived, never drifted
+
+ENTROPY_NOISE = 0.05
+POSITIVE_NOISE = 0.1
+
+# Drift starts between these fractions of the timeline (25-60 of 90 days)
+DRIFT_START_RANGE = (25 / 90, 60 / 90)
+DRIFT_STRENGTH_RANGE = (0.2, 0.6)
+
+# Users drawn from one independently seeded generator; output does not
+# depend on how users are grouped into chunks
+BLOCK_USERS = 1_000
+
+
+# -----------------------------
+# Per-user draws
+# -----------------------------
+def _baselines(rng, n_users):
+    low = np.array([r[0] for r in BASELINE_RANGES.values()], dtype=float)
+    high = np.array([r[1] for r in BASELINE_RANGES.values()], dtype=float)
+    return rng.uniform(low, high, size=(n_users, len(FEATURES)))
+
+
+def _drift_multipliers(rng, n_users, num_days, drift_ratio):
+    """(users x days x features) multiplier applied to each baseline"""
+    drifting = rng.random(n_users) < drift_ratio
+    gradual = rng.random(n_users) < 0.5
+
+    start_low = int(num_days * DRIFT_START_RANGE[0])
+    start_high = max(int(num_days * DRIFT_START_RANGE[1]), start_low + 1)
+    start = rng.integers(start_low, start_high, size=n_users)
+
+    # 1 or 2 distinct affected features per user
+    n_affected = rng.integers(1, 3, size=n_users)
+    ranks = np.argsort(rng.random((n_users, len(DRIFTABLE))), axis=1).argsort(axis=1)
+    affected = np.zeros((n_users, len(FEATURES)), dtype=bool)
+    affected[:, :len(DRIFTABLE)] = ranks < n_affected[:, None]
+    affected &= drifting[:, None]
+
+    strength = rng.uniform(*DRIFT_STRENGTH_RANGE, size=n_users)
+
+    days = np.arange(num_days)
+    active = days[None, :] >= start[:, None]
+    progress = np.where(
+        gradual[:, None],
+        (days[None, :] - start[:, None]) / (num_days - start[:, None]),
+        1.0,
+    )
+    day_multiplier = 1 + strength[:, None] * progress * active
+
+    return np.where(affected[:, None, :], day_multiplier[:, :, None], 1.0)
+
+
+# -----------------------------
+# User ids
+# -----------------------------
+def user_categories(num_users):
+    """
+    Shared user_id dictionary for `num_users` users: a categorical dtype
+    with lexically sorted names, and the code of user i at position i.
+    """
+    names = np.array([f"user_{i}" for i in range(num_users)], dtype=object)
+    order = np.argsort(names)
+    codes = np.empty(num_users, dtype=np.int32)
+    codes[order] = np.arange(num_users)
+    return pd.CategoricalDtype(names[order]), codes
+
+
+# -----------------------------
+# Block generator
+# -----------------------------
+def generate_block(seed, block, num_days, drift_ratio, n_users=BLOCK_USERS, users=None):
+    """
+    Rows for users `block * BLOCK_USERS` onwards, as a DataFrame.
+
+    `users` is a shared `user_categories` table; blocks generated with the
+    same table concatenate without re-encoding user ids.
+    """
+    rng = np.random.default_rng([seed, block])
+    first_user = block * BLOCK_USERS
+
+    baseline = _baselines(rng, n_users)
+    values = baseline[:, None, :] * _drift_multipliers(
+        rng, n_users, num_days, drift_ratio
+    )
+
+    # Noise + constraints
+    is_entropy = np.array(["entropy" in f for f in FEATURES])
+    noise = rng.normal(size=values.shape) * np.where(
+        is_entropy, ENTROPY_NOISE, POSITIVE_NOISE
+    )
+    values = np.where(
+        is_entropy,
+        np.clip(values + noise, 0.01, 0.99),
+        np.maximum(values + noise, 0.01),
+    )
+
+    # Inter-day variability depends on yesterday (including yesterday's
+    # variability), so only this feature is resolved day by day
+    idv = FEATURES.index("inter_day_variability")
+    prev = baseline.copy()
+    for day in range(num_days):
+        today = values[:, day, :]
+        variability = np.mean(np.abs(today - prev) / (prev + 1e-6), axis=1)
+        today[:, idv] = np.clip(variability, 0.01, 1.0)
+        prev = today
+
+    dtype, codes = users or user_categories(first_user + n_users)
+    df = pd.DataFrame({
+        "user_id": pd.Categorical.from_codes(
+            np.repeat(codes[first_user:first_user + n_users], num_days), dtype=dtype
+        ),
+        "day": np.tile(np.arange(num_days), n_users),
+    })
+    for i, feature in enumerate(FEATURES):
+        df[feature] = values[:, :, i].ravel()
+
+    return df
+
+
+def iter_generated_chunks(seed, num_users, num_days, drift_ratio, chunk_users):
+    """Yield DataFrames of about `chunk_users` users (whole blocks each)"""
+    blocks_per_chunk = max(1, chunk_users // BLOCK_USERS)
+    n_blocks = -(-num_users // BLOCK_USERS)
+    users = user_categories(num_users)
+
+    for first in range(0, n_blocks, blocks_per_chunk):
+        frames = []
+        for block in range(first, min(first + blocks_per_chunk, n_blocks)):
+            n_users = min(BLOCK_USERS, num_users - block * BLOCK_USERS)
+            frames.append(
+                generate_block(seed, block, num_days, drift_ratio, n_users, users)
+            )
+        yield pd.concat(frames, ignore_index=True)
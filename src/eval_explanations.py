@@ -1,8 +1,8 @@
-import pandas as pd
+from engine.artifacts import read_artifact
 
-EXPLAIN_PATH = "data/drift_explanations.csv"
+EXPLAIN_PATH = "data/drift_explanations"
 
-df = pd.read_csv(EXPLAIN_PATH)
+df = read_artifact(EXPLAIN_PATH)
 
 # Look at strongest contributions
 top = df.reindex(df["contribution"].abs().sort_values(ascending=False).index)
@@ -1,17 +1,12 @@
 import pandas as pd
 
-DRIFT_PATH = "data/drift_scores.csv"
-THRESHOLD = 0.15
+from engine.artifacts import read_artifact
 
-df = pd.read_csv(DRIFT_PATH)
+# Onsets are detected once by the scoring stage (engine.onset): the first
+# run of CONSECUTIVE_DAYS consecutive days above DRIFT_THRESHOLD
+ONSET_PATH = "data/drift_onsets"
 
-onsets = []
-
-for user_id, user_df in df.groupby("user_id"):
-    above = user_df[user_df["drift_score"] > THRESHOLD]
-    if len(above) >= 3:
-        onset_day = above.iloc[0]["day"]
-        onsets.append(onset_day)
+onsets = read_artifact(ONSET_PATH)["onset_day"]
 
 print("Onset day statistics:")
 print(pd.Series(onsets).describe())
@@ -1,13 +1,16 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 
-DRIFT_PATH = "data/drift_scores.csv"
+from engine.artifacts import read_artifact
+from engine.leaderboard import Leaderboard
 
-df = pd.read_csv(DRIFT_PATH)
+DRIFT_PATH = "data/drift_scores"
+LEADERBOARD_PATH = "data/drift_leaderboard"
 
-# Find users with strongest drift
-stats = df.groupby("user_id")["drift_score"].max().reset_index()
-drifting_users = stats.sort_values("drift_score", ascending=False).head(5)["user_id"]
+df = read_artifact(DRIFT_PATH)
+leaderboard = Leaderboard.from_frame(read_artifact(LEADERBOARD_PATH))
+
+# Find users with strongest drift (precomputed per-user max, kept sorted)
+drifting_users, _, _ = leaderboard.rows(leaderboard.top("max", 5))
 
 plt.figure()
 for user in drifting_users:
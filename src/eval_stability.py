@@ -1,15 +1,18 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 
-DRIFT_PATH = "data/drift_scores.csv"
+from engine.artifacts import read_artifact
+from engine.leaderboard import Leaderboard
 
-df = pd.read_csv(DRIFT_PATH)
+DRIFT_PATH = "data/drift_scores"
+LEADERBOARD_PATH = "data/drift_leaderboard"
 
-# Compute per-user drift stats
-stats = df.groupby("user_id")["drift_score"].agg(["mean", "std"]).reset_index()
+df = read_artifact(DRIFT_PATH)
+
+# Per-user drift stats are precomputed by the scoring stage
+leaderboard = Leaderboard.from_frame(read_artifact(LEADERBOARD_PATH))
 
 # Select most stable users
-stable_users = stats.sort_values("mean").head(5)["user_id"]
+stable_users, _, _ = leaderboard.rows(leaderboard.bottom("mean", 5))
 
 # Plot drift timelines
 plt.figure()
@@ -3,10 +3,16 @@ import requests
 import pandas as pd
 import numpy as np
 import altair as alt
+from requests.adapters import HTTPAdapter
 
 API_BASE = "http://127.0.0.1:8000"
-DRIFT_THRESHOLD = 0.15
-CONSECUTIVE_DAYS = 3
+
+# Per-user payloads are cached per dataset version; the version itself is
+# re-checked every VERSION_TTL seconds so a reloaded dataset shows up quickly
+SUMMARY_TTL = 600
+VERSION_TTL = 15
+CACHED_USERS = 256
+REQUEST_TIMEOUT = 10
 
 st.set_page_config(
     page_title="Behavior Drift Observatory",
@@ -102,6 +108,85 @@ def behavior_label(score):
         return "Strong Drift"
 
 
+# -------------------------------------------------
+# API access
+# -------------------------------------------------
+@st.cache_resource
+def api_session():
+    """One pooled keep-alive session shared by every rerun and browser tab"""
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=8))
+    return session
+
+
+@st.cache_data(ttl=VERSION_TTL, show_spinner=False)
+def fetch_dataset_version():
+    response = api_session().get(f"{API_BASE}/health", timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    return response.json().get("dataset_version", "")
+
+
+@st.cache_data(ttl=SUMMARY_TTL, max_entries=CACHED_USERS, show_spinner=False)
+def fetch_user_summary(user_id, dataset_version):
+    """
+    Timeline, onset, latest score and explanation for a user in one request,
+    with the timeline frame prepared for the chart. None if the user is
+    unknown. `dataset_version` is part of the cache key only.
+    """
+    response = api_session().get(
+        f"{API_BASE}/drift/summary/{user_id}", timeout=REQUEST_TIMEOUT
+    )
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    summary = response.json()
+
+    timeline_df = pd.DataFrame(summary["timeline"]).sort_values("day")
+    timeline_df["Behavior State"] = timeline_df["drift_score"].apply(
+        behavior_label
+    )
+    timeline_df["Day Label"] = timeline_df["day"].apply(
+        lambda d: f"Day {d}"
+    )
+
+    explanation = summary["explanation"] or {"explanations": []}
+    explain_df = pd.DataFrame(
+        explanation["explanations"],
+        columns=["feature", "contribution", "direction"],
+    )
+
+    return timeline_df, summary["onset_day"], summary["latest"], explain_df
+
+
+@st.cache_resource(ttl=SUMMARY_TTL, max_entries=CACHED_USERS)
+def timeline_chart(user_id, dataset_version):
+    """Altair chart of a user's timeline, built once per user and dataset"""
+    timeline_df = fetch_user_summary(user_id, dataset_version)[0]
+
+    return (
+        alt.Chart(timeline_df)
+        .mark_line(point=True,interpolate="monotone")
+        .encode(
+            x=alt.X(
+                "day:Q",
+                title="Day",
+                axis=alt.Axis(grid=False)
+            ),
+            y=alt.Y(
+                "drift_score:Q",
+                title=None,                 # 🚫 NO Y-axis label
+                axis=alt.Axis(labels=False, ticks=True, grid=True)
+            ),
+            tooltip=[
+                alt.Tooltip("Day Label:N", title="Time"),
+                alt.Tooltip("Behavior State:N", title="Behavior")
+            ]
+        )
+        .properties(height=300)
+        .interactive()
+    )
+
+
 # -------------------------------------------------
 # Header
 # -------------------------------------------------
@@ -119,39 +204,24 @@ user_id = st.sidebar.text_input(
 )
 
 # -------------------------------------------------
-# Fetch timeline
+# Fetch user summary
 # -------------------------------------------------
+# One cached round trip per (user, dataset version); onset of sustained
+# drift is precomputed by the pipeline
 try:
-    timeline_resp = requests.get(f"{API_BASE}/drift/score/{user_id}").json()
-    timeline_df = pd.DataFrame(timeline_resp["timeline"])
+    dataset_version = fetch_dataset_version()
+    summary = fetch_user_summary(user_id, dataset_version)
 except Exception:
+    summary = None
+
+if summary is None:
     st.error("User not found or API unavailable")
     st.stop()
 
-# -------------------------------------------------
-# Compute drift onset
-# -------------------------------------------------
-timeline_df = timeline_df.sort_values("day")
+timeline_df, onset_day, latest, explain_df = summary
 
-timeline_df["Behavior State"] = timeline_df["drift_score"].apply(
-    behavior_label
-)
-
-timeline_df["Day Label"] = timeline_df["day"].apply(
-    lambda d: f"Day {d}"
-)
-
-
-above = timeline_df["drift_score"] > DRIFT_THRESHOLD
-onset_day = None
-
-for i in range(len(above) - CONSECUTIVE_DAYS):
-    if above.iloc[i:i+CONSECUTIVE_DAYS].all():
-        onset_day = int(timeline_df.iloc[i]["day"])
-        break
-
-latest_day = int(timeline_df.iloc[-1]["day"])
-latest_score = float(timeline_df.iloc[-1]["drift_score"])
+latest_day = int(latest["day"])
+latest_score = float(latest["drift_score"])
 
 # -------------------------------------------------
 # Drift status
@@ -200,28 +270,7 @@ st.caption(
     "Hover over the line to see daily behavior interpretation"
 )
 
-chart = (
-    alt.Chart(timeline_df)
-    .mark_line(point=True,interpolate="monotone")
-    .encode(
-        x=alt.X(
-            "day:Q",
-            title="Day",
-            axis=alt.Axis(grid=False)
-        ),
-        y=alt.Y(
-            "drift_score:Q",
-            title=None,                 # 🚫 NO Y-axis label
-            axis=alt.Axis(labels=False, ticks=True, grid=True)
-        ),
-        tooltip=[
-            alt.Tooltip("Day Label:N", title="Time"),
-            alt.Tooltip("Behavior State:N", title="Behavior")
-        ]
-    )
-    .properties(height=300)
-    .interactive()
-)
+chart = timeline_chart(user_id, dataset_version)
 
 st.altair_chart(chart, use_container_width=True)    
 
@@ -232,8 +281,6 @@ st.altair_chart(chart, use_container_width=True)
 
 st.subheader("Behavior Insights")
 
-explain_resp = requests.get(f"{API_BASE}/drift/explanation/{user_id}").json()
-explain_df = pd.DataFrame(explain_resp["explanations"])
 raw_explain_df = explain_df.copy()
 
 raw_explain_df["abs_contribution"] = raw_explain_df["contribution"].abs()
@@ -1,6 +1,12 @@
-import numpy as np
+import argparse
+import time
+
 import pandas as pd
 
+from engine.artifacts import ArtifactWriter, write_artifact
+from engine.metrics import write_stage_metrics
+from engine.synthetic import BLOCK_USERS, iter_generated_chunks
+
 # -----------------------------
 # Global configuration
 # -----------------------------
@@ -9,105 +15,59 @@ NUM_USERS = 500
 NUM_DAYS = 90
 DRIFT_RATIO = 0.3  # 30% of users drift
 
-np.random.seed(SEED)
-
-# -----------------------------
-# Helper functions
-# -----------------------------
-def entropy_like(value, noise=0.05):
-    """Clamp entropy-like values between 0 and 1"""
-    return np.clip(value + np.random.normal(0, noise), 0.01, 0.99)
-
-def positive(value, noise=0.1):
-    """Ensure positive continuous values"""
-    return max(0.01, value + np.random.normal(0, noise))
+OUTPUT_PATH = "data/synthetic_behavior"
 
 # -----------------------------
-# User baseline generator
+# Arguments
 # -----------------------------
-def generate_user_baseline():
-    return {
-        "session_count": np.random.uniform(2, 6),
-        "avg_session_duration": np.random.uniform(8, 18),
-        "active_hours_entropy": np.random.uniform(0.3, 0.6),
-        "action_type_entropy": np.random.uniform(0.4, 0.7),
-        "inter_day_variability": np.random.uniform(0.05, 0.15),
-    }
-
-# -----------------------------
-# Drift configuration per user
-# -----------------------------
-def assign_drift():
-    if np.random.rand() > DRIFT_RATIO:
-        return None
-
-    drift_type = np.random.choice(["sudden", "gradual"])
-    drift_start = np.random.randint(25, 60)
-    affected = np.random.choice(
-        ["session_count", "avg_session_duration",
-         "active_hours_entropy", "action_type_entropy"],
-        size=np.random.randint(1, 3),
-        replace=False
-    )
-    strength = np.random.uniform(0.2, 0.6)
-
-    return {
-        "type": drift_type,
-        "start_day": drift_start,
-        "features": affected,
-        "strength": strength
-    }
+parser = argparse.ArgumentParser(description="Generate synthetic behavior data")
+parser.add_argument("--users", type=int, default=NUM_USERS)
+parser.add_argument("--days", type=int, default=NUM_DAYS)
+parser.add_argument("--drift-ratio", type=float, default=DRIFT_RATIO)
+parser.add_argument("--seed", type=int, default=SEED)
+parser.add_argument("--output", default=OUTPUT_PATH, help="artifact stem")
+parser.add_argument("--chunk-users", type=int, default=None,
+                    help=f"write in chunks of this many users (csv or parquet); "
+                         f"users are drawn in blocks of {BLOCK_USERS}, so this is "
+                         f"rounded down to a multiple of {BLOCK_USERS}")
+args = parser.parse_args()
+
+if args.chunk_users is not None and args.chunk_users < BLOCK_USERS:
+    parser.error(f"--chunk-users must be at least {BLOCK_USERS} (one block of users)")
 
 # -----------------------------
 # Main data generation
 # -----------------------------
-rows = []
-
-for user_id in range(NUM_USERS):
-    baseline = generate_user_baseline()
-    drift = assign_drift()
-
-    prev_day_values = baseline.copy()
-
-    for day in range(NUM_DAYS):
-        values = {}
-
-        for feature, base_value in baseline.items():
-            current_value = base_value
-
-            # Apply drift if applicable
-            if drift and day >= drift["start_day"] and feature in drift["features"]:
-                if drift["type"] == "sudden":
-                    current_value *= (1 + drift["strength"])
-                elif drift["type"] == "gradual":
-                    progress = (day - drift["start_day"]) / (NUM_DAYS - drift["start_day"])
-                    current_value *= (1 + drift["strength"] * progress)
-
-            # Noise + constraints
-            if "entropy" in feature:
-                values[feature] = entropy_like(current_value)
-            else:
-                values[feature] = positive(current_value)
-
-        # Inter-day variability depends on yesterday
-        variability = np.mean([
-            abs(values[f] - prev_day_values[f]) / (prev_day_values[f] + 1e-6)
-            for f in values
-        ])
-        values["inter_day_variability"] = np.clip(variability, 0.01, 1.0)
-
-        prev_day_values = values.copy()
-
-        rows.append({
-            "user_id": f"user_{user_id}",
-            "day": day,
-            **values
-        })
+# Users are drawn in seeded blocks with batched array draws, so the same
+# seed gives the same data whether or not the output is chunked
+start = time.perf_counter()
+
+chunks = iter_generated_chunks(
+    args.seed,
+    args.users,
+    args.days,
+    args.drift_ratio,
+    args.chunk_users or args.users,
+)
+
+if args.chunk_users is None:
+    df = pd.concat(chunks, ignore_index=True)
+    output_file = write_artifact(df, args.output)
+    shape = df.shape
+else:
+    columns = 0
+    with ArtifactWriter(args.output) as writer:
+        for chunk in chunks:
+            writer.write(chunk)
+            columns = chunk.shape[1]
+    output_file = writer.path
+    shape = (writer.rows, columns)
+
+elapsed = time.perf_counter() - start
+write_stage_metrics("generation", elapsed, {"synthetic_behavior": shape[0]})
 
 # -----------------------------
 # Save dataset
 # -----------------------------
-df = pd.DataFrame(rows)
-df.to_csv("data/synthetic_behavior.csv", index=False)
-
-print("Synthetic dataset generated:", df.shape)
+print(f"Synthetic dataset generated: {shape} in {elapsed:.2f}s")
+print("Saved to:", output_file)
@@ -0,0 +1,304 @@
+import argparse
+import asyncio
+import json
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from engine.artifacts import read_artifact
+
+# -----------------------------
+# Configuration
+# -----------------------------
+BASE_DIR = Path(__file__).resolve().parents[1]
+DRIFT_PATH = BASE_DIR / "data" / "drift_scores"
+
+ENDPOINTS = {
+    "score": "/drift/score/{user_id}",
+    "latest": "/drift/latest/{user_id}",
+    "explanation": "/drift/explanation/{user_id}",
+}
+
+# Histogram bucket upper bounds in milliseconds
+BUCKETS_MS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, float("inf")]
+
+# -----------------------------
+# Arguments
+# -----------------------------
+parser = argparse.ArgumentParser(description="Concurrent load test for the drift API")
+parser.add_argument("--mode", choices=["http", "asgi"], default="http",
+                    help="http: real uvicorn server; asgi: call the app in-process")
+parser.add_argument("--url", default=None,
+                    help="server to hit in http mode (default: start a local uvicorn)")
+parser.add_argument("--concurrency", type=int, default=32)
+parser.add_argument("--duration", type=float, default=10.0, help="seconds per endpoint")
+parser.add_argument("--endpoints", default=",".join(ENDPOINTS))
+parser.add_argument("--distribution", choices=["uniform", "zipf"], default="uniform")
+parser.add_argument("--zipf-s", type=float, default=1.1, help="zipf exponent (hot keys)")
+parser.add_argument("--seed", type=int, default=42)
+parser.add_argument("--output", type=Path, default=None, help="write results as JSON")
+args = parser.parse_args()
+
+
+# -----------------------------
+# User-ID sampling
+# -----------------------------
+def user_sampler(users, distribution, zipf_s, seed):
+    """Infinite iterator of user ids (uniform or hot-key zipf)"""
+    rng = np.random.default_rng(seed)
+
+    if distribution == "zipf":
+        weights = 1.0 / np.arange(1, len(users) + 1) ** zipf_s
+        probabilities = weights / weights.sum()
+        users = rng.permutation(users)  # hot keys are random users
+    else:
+        probabilities = None
+
+    while True:
+        yield from rng.choice(users, size=4096, p=probabilities).tolist()
+
+
+# -----------------------------
+# Clients
+# -----------------------------
+class HttpClient:
+    """Minimal keep-alive HTTP/1.1 GET client on asyncio streams"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def get(self, path):
+        """
+        Status code of one GET. Raises ConnectionError when the server drops
+        the connection; the next call reconnects.
+        """
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+        try:
+            return await self._request(path)
+        except (ConnectionError, asyncio.IncompleteReadError) as exc:
+            await self.close()
+            raise ConnectionError(f"Connection lost during GET {path}") from exc
+
+    async def _request(self, path):
+        self.writer.write(
+            f"GET {path} HTTP/1.1\r\nHost: {self.host}\r\n\r\n".encode()
+        )
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            # Server closed the keep-alive connection
+            raise ConnectionError("Empty status line")
+        status = int(status_line.split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode().partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        await self.reader.readexactly(length)
+
+        return status
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+
+class AsgiClient:
+    """Calls the ASGI app directly, without sockets"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def get(self, path):
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": b"",
+            "root_path": "",
+            "headers": [(b"host", b"loadtest")],
+            "client": ("127.0.0.1", 0),
+            "server": ("loadtest", 80),
+        }
+        status = None
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        await self.app(scope, receive, send)
+        return status
+
+    async def close(self):
+        pass
+
+
+# -----------------------------
+# Load generation
+# -----------------------------
+async def run_endpoint(make_client, template, users, concurrency, duration):
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal errors
+        client = make_client()
+        try:
+            while time.perf_counter() < deadline:
+                path = template.format(user_id=next(users))
+                start = time.perf_counter()
+                try:
+                    status = await client.get(path)
+                except ConnectionError:
+                    # Counted as a failed request; the client reconnects
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - start)
+                if status != 200:
+                    errors += 1
+        finally:
+            await client.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    return np.array(latencies) * 1e3, errors, elapsed
+
+
+def summarize(latencies_ms, errors, elapsed):
+    counts, _ = np.histogram(latencies_ms, bins=[0] + BUCKETS_MS)
+    p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99]) if len(latencies_ms) else (0, 0, 0)
+    return {
+        "requests": int(len(latencies_ms)),
+        "errors": int(errors),
+        "rps": round(len(latencies_ms) / elapsed, 1),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "max_ms": round(float(latencies_ms.max()), 3) if len(latencies_ms) else 0.0,
+        "histogram": {
+            f"<={bound}ms" if bound != float("inf") else ">1000ms": int(count)
+            for bound, count in zip(BUCKETS_MS, counts)
+        },
+    }
+
+
+def print_report(name, stats):
+    print(
+        f"\n{name}: {stats['requests']} requests, {stats['errors']} errors, "
+        f"{stats['rps']:,.0f} req/s\n"
+        f"  p50 {stats['p50_ms']:.2f} ms | p95 {stats['p95_ms']:.2f} ms | "
+        f"p99 {stats['p99_ms']:.2f} ms | max {stats['max_ms']:.2f} ms"
+    )
+    peak = max(stats["histogram"].values()) or 1
+    for bucket, count in stats["histogram"].items():
+        if count:
+            print(f"  {bucket:>10} {count:>8} {'#' * max(1, round(40 * count / peak))}")
+
+
+# -----------------------------
+# Server management
+# -----------------------------
+def start_local_server():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.api.main:app",
+         "--port", str(port), "--log-level", "warning"],
+        cwd=BASE_DIR,
+    )
+
+    # Wait until /health reports the dataset is loaded
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1) as sock:
+                sock.sendall(b"GET /health HTTP/1.1\r\nHost: x\r\n\r\n")
+                if sock.recv(16).startswith(b"HTTP/1.1 200"):
+                    return server, port
+        except OSError:
+            time.sleep(0.2)
+
+    server.terminate()
+    raise RuntimeError("Local uvicorn did not become healthy")
+
+
+# -----------------------------
+# Main
+# -----------------------------
+async def main():
+    users = read_artifact(DRIFT_PATH, columns=["user_id"])["user_id"].unique()
+    sampler = user_sampler(users, args.distribution, args.zipf_s, args.seed)
+
+    server = None
+    if args.mode == "asgi":
+        sys.path.insert(0, str(BASE_DIR))
+        from src.api.main import app, dataset
+        dataset.reload()  # no lifespan in-process; load before timing
+        make_client = lambda: AsgiClient(app)
+        target = "in-process ASGI"
+    else:
+        if args.url is None:
+            server, port = start_local_server()
+            host = "127.0.0.1"
+        else:
+            host, _, port = args.url.split("://")[-1].rstrip("/").partition(":")
+            port = int(port or 80)
+        make_client = lambda: HttpClient(host, port)
+        target = f"http://{host}:{port}"
+
+    print(
+        f"Target: {target} | {len(users)} users, {args.distribution} distribution | "
+        f"concurrency {args.concurrency} | {args.duration:.0f}s per endpoint"
+    )
+
+    results = {}
+    try:
+        for name in args.endpoints.split(","):
+            latencies, errors, elapsed = await run_endpoint(
+                make_client, ENDPOINTS[name], sampler, args.concurrency, args.duration
+            )
+            results[name] = summarize(latencies, errors, elapsed)
+            print_report(ENDPOINTS[name], results[name])
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    if args.output:
+        args.output.write_text(json.dumps({
+            "mode": args.mode,
+            "distribution": args.distribution,
+            "concurrency": args.concurrency,
+            "results": results,
+        }, indent=2))
+        print(f"\nResults saved to: {args.output}")
+
+
+asyncio.run(main())
@@ -0,0 +1,368 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+from engine.artifacts import write_artifact
+from engine.changepoint import empty_detector_state, feed_scores
+from engine.keys import decode_keys
+from engine.leaderboard import Leaderboard
+from engine.onset import CONSECUTIVE_DAYS, DRIFT_THRESHOLD, score_onsets
+from engine.representation import build_representations, representation_columns
+from engine.scorers import SCORING_MODES
+from engine.scoring import score_representations
+from engine.sketch import population_sketches
+from engine.store import write_score_store
+from engine.synthetic import iter_generated_chunks
+
+# -----------------------------
+# Configuration
+# -----------------------------
+BASE_DIR = Path(__file__).resolve().parents[1]
+
+BASELINE_PATH = BASE_DIR / "benchmarks" / "baseline.json"
+RESULTS_PATH = BASE_DIR / "benchmarks" / "results.json"
+
+# (users, days) datasets
+SIZES = [
+    (1_000, 90),
+    (1_000, 365),
+    (10_000, 90),
+    (10_000, 365),
+    (100_000, 90),
+    (100_000, 365),
+]
+
+SEED = 42
+DRIFT_RATIO = 0.3
+REPEATS = 3
+TOLERANCE = 0.25  # allowed fractional slowdown / memory growth
+
+WINDOW_SPECS = [(window, ["mean", "std", "min", "max"]) for window in (7, 14, 30)]
+SCORE_STATISTICS = ["mean"]
+SCORE_WINDOWS = [14]
+REFERENCE_WINDOW = 30
+CURRENT_WINDOW = 14
+EPSILON = 1e-8
+TOP_K = 3
+
+FEATURE_COLUMNS = [
+    "session_count",
+    "avg_session_duration",
+    "active_hours_entropy",
+    "action_type_entropy",
+    "inter_day_variability"
+]
+
+# -----------------------------
+# Arguments
+# -----------------------------
+parser = argparse.ArgumentParser(
+    description="Time every pipeline stage and compare against a stored baseline"
+)
+parser.add_argument("--sizes", default=None,
+                    help="comma-separated USERSxDAYS list, e.g. 1000x90,10000x365")
+parser.add_argument("--repeats", type=int, default=REPEATS)
+parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+parser.add_argument("--output", type=Path, default=RESULTS_PATH)
+parser.add_argument("--record-baseline", "--update-baseline", action="store_true",
+                    dest="record_baseline",
+                    help="store this run as the new baseline (required once per "
+                         "machine; without a baseline the check fails)")
+args = parser.parse_args()
+
+sizes = SIZES
+if args.sizes:
+    sizes = [tuple(int(v) for v in size.split("x")) for size in args.sizes.split(",")]
+
+
+# -----------------------------
+# Measurement helpers
+# -----------------------------
+def measure(fn, rows, repeats):
+    """Best-of-N wall time, plus peak traced memory from one extra run"""
+    best = float("inf")
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, {
+        "seconds": round(best, 4),
+        "rows_per_sec": round(rows / best, 1),
+        "peak_mb": round(peak / 1e6, 2),
+    }
+
+
+def measure_api_startup(data_dir, rows, repeats):
+    """Cold import of the API plus its first dataset load, in a fresh process"""
+    # ru_maxrss survives exec and would report the parent's peak, so the
+    # child's own high-water mark is read from /proc when available
+    probe = (
+        "import json, os, resource, time\n"
+        "start = time.perf_counter()\n"
+        "import src.api.main as api\n"
+        "api.dataset.reload()\n"
+        "elapsed = time.perf_counter() - start\n"
+        "rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss\n"
+        "if os.path.exists('/proc/self/status'):\n"
+        "    for line in open('/proc/self/status'):\n"
+        "        if line.startswith('VmHWM:'):\n"
+        "            rss = int(line.split()[1])\n"
+        "print(json.dumps({'seconds': elapsed, 'rss_kb': rss}))\n"
+    )
+    env = dict(os.environ, BDO_DATA_DIR=str(data_dir))
+
+    runs = []
+    for _ in range(repeats):
+        out = subprocess.run(
+            [sys.executable, "-c", probe],
+            cwd=BASE_DIR, env=env, capture_output=True, text=True, check=True,
+        )
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    best = min(run["seconds"] for run in runs)
+    return {
+        "seconds": round(best, 4),
+        "rows_per_sec": round(rows / best, 1),
+        "peak_mb": round(max(run["rss_kb"] for run in runs) / 1e3, 2),
+    }
+
+
+def measure_key_memory(frames):
+    """In-memory size of each frame with interned keys vs plain string keys"""
+    memory = {}
+    for name, frame in frames.items():
+        encoded = frame.memory_usage(deep=True).sum()
+        plain = decode_keys(frame).memory_usage(deep=True).sum()
+        memory[name] = {
+            "encoded_mb": round(encoded / 1e6, 2),
+            "string_mb": round(plain / 1e6, 2),
+            "saved_mb": round((plain - encoded) / 1e6, 2),
+        }
+    return memory
+
+
+# -----------------------------
+# Run suite
+# -----------------------------
+results = {}
+key_memory = {}
+scorer_cost = {}
+sketch_memory = {}
+
+for users, days in sizes:
+    key = f"{users}x{days}"
+    print(f"\n=== {key} ({users * days:,} rows) ===")
+    stages = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        df, stages["generation"] = measure(
+            lambda: pd.concat(
+                iter_generated_chunks(SEED, users, days, DRIFT_RATIO, users),
+                ignore_index=True,
+            ),
+            users * days,
+            args.repeats,
+        )
+
+        rep_df, stages["representation"] = measure(
+            lambda: build_representations(df, FEATURE_COLUMNS, WINDOW_SPECS),
+            len(df),
+            args.repeats,
+        )
+        rep_columns, rep_labels = representation_columns(
+            rep_df.columns, SCORE_STATISTICS, SCORE_WINDOWS
+        )
+
+        # Scoring includes the fused top-K explanation
+        (drift_df, explain_df), stages["scoring"] = measure(
+            lambda: score_representations(
+                rep_df,
+                rep_columns,
+                rep_labels,
+                REFERENCE_WINDOW,
+                CURRENT_WINDOW,
+                EPSILON,
+                TOP_K,
+            ),
+            len(rep_df),
+            args.repeats,
+        )
+
+        # Same windows through every other registered scorer
+        for mode in SCORING_MODES:
+            if mode == "l2":
+                continue
+            _, stages[f"scoring_{mode}"] = measure(
+                lambda: score_representations(
+                    rep_df,
+                    rep_columns,
+                    rep_labels,
+                    REFERENCE_WINDOW,
+                    CURRENT_WINDOW,
+                    EPSILON,
+                    TOP_K,
+                    mode,
+                ),
+                len(rep_df),
+                args.repeats,
+            )
+
+        # Seconds per million scored (user, day) pairs, per scorer
+        scorer_cost[key] = {
+            mode: round(
+                stages["scoring" if mode == "l2" else f"scoring_{mode}"]["seconds"]
+                * 1e6 / len(drift_df),
+                3,
+            )
+            for mode in SCORING_MODES
+        }
+
+        leaderboard, stages["leaderboard"] = measure(
+            lambda: Leaderboard.from_scores(drift_df),
+            len(drift_df),
+            args.repeats,
+        )
+
+        (_, onset_days), stages["onset"] = measure(
+            lambda: score_onsets(drift_df, DRIFT_THRESHOLD, CONSECUTIVE_DAYS),
+            len(drift_df),
+            args.repeats,
+        )
+
+        # Per-(metric, day, cohort) t-digests of every feature and score
+        sketches, stages["sketches"] = measure(
+            lambda: population_sketches(df, drift_df, FEATURE_COLUMNS),
+            len(df) * len(FEATURE_COLUMNS) + len(drift_df),
+            args.repeats,
+        )
+        sketch_memory[key] = {
+            "sketches": len(sketches),
+            "centroids": len(sketches.means),
+            "kb": round(sketches.nbytes / 1e3, 1),
+        }
+
+        # Every score replayed through the CUSUM / Page-Hinkley detectors
+        _, stages["changepoint"] = measure(
+            lambda: feed_scores(empty_detector_state(), drift_df),
+            len(drift_df),
+            args.repeats,
+        )
+
+        write_artifact(drift_df, Path(tmp) / "drift_scores")
+        write_artifact(explain_df, Path(tmp) / "drift_explanations")
+        write_score_store(
+            Path(tmp) / "score_store", drift_df, explain_df, leaderboard, onset_days
+        )
+
+        stages["api_startup"] = measure_api_startup(tmp, len(drift_df), args.repeats)
+
+    for stage, metrics in stages.items():
+        print(
+            f"{stage:<24}{metrics['seconds']:>10.3f}s"
+            f"{metrics['rows_per_sec']:>16,.0f} rows/s"
+            f"{metrics['peak_mb']:>12.1f} MB"
+        )
+
+    for mode, cost in scorer_cost[key].items():
+        print(f"{mode:<24}{cost:>10.3f}s per 1M (user, day) pairs")
+
+    print(
+        f"{'sketches':<24}{sketch_memory[key]['sketches']:>10,} sketches"
+        f"{sketch_memory[key]['centroids']:>10,} centroids"
+        f"{sketch_memory[key]['kb']:>10.1f} KB"
+    )
+
+    key_memory[key] = measure_key_memory(
+        {"input": df, "representation": rep_df, "scores": drift_df, "explanations": explain_df}
+    )
+    for name, metrics in key_memory[key].items():
+        print(
+            f"{name:<16}{metrics['encoded_mb']:>9.1f} MB keys interned"
+            f"{metrics['string_mb']:>10.1f} MB as strings"
+            f"{metrics['saved_mb']:>10.1f} MB saved"
+        )
+
+    results[key] = stages
+    del df, rep_df, drift_df, explain_df, leaderboard
+
+report = {
+    "python": platform.python_version(),
+    "machine": platform.machine(),
+    "cpu_count": os.cpu_count(),
+    "results": results,
+    "key_memory": key_memory,
+    "scorer_cost": scorer_cost,
+    "sketch_memory": sketch_memory,
+}
+
+args.output.parent.mkdir(parents=True, exist_ok=True)
+args.output.write_text(json.dumps(report, indent=2))
+print(f"\nResults saved to: {args.output}")
+
+# -----------------------------
+# Regression check
+# -----------------------------
+# Throughput depends on the machine, so baselines are recorded locally
+# (benchmarks/baseline.json is not committed); a missing or non-matching
+# baseline fails the check instead of passing it silently
+if args.record_baseline:
+    args.baseline.parent.mkdir(parents=True, exist_ok=True)
+    args.baseline.write_text(json.dumps(report, indent=2))
+    print(f"Baseline recorded: {args.baseline}")
+    sys.exit(0)
+
+if not args.baseline.exists():
+    print(f"\n✘ No baseline at {args.baseline} (record one with --record-baseline)")
+    sys.exit(1)
+
+baseline = json.loads(args.baseline.read_text())["results"]
+regressions = []
+compared = 0
+
+for key, stages in results.items():
+    for stage, metrics in stages.items():
+        base = baseline.get(key, {}).get(stage)
+        if base is None:
+            continue
+
+        compared += 1
+        if metrics["rows_per_sec"] < base["rows_per_sec"] * (1 - args.tolerance):
+            regressions.append(
+                f"{key} {stage}: throughput {metrics['rows_per_sec']:,.0f} rows/s "
+                f"vs baseline {base['rows_per_sec']:,.0f}"
+            )
+        if metrics["peak_mb"] > base["peak_mb"] * (1 + args.tolerance):
+            regressions.append(
+                f"{key} {stage}: peak memory {metrics['peak_mb']:.1f} MB "
+                f"vs baseline {base['peak_mb']:.1f}"
+            )
+
+if compared == 0:
+    print(f"\n✘ No stage of this run is in the baseline {args.baseline} "
+          f"(different --sizes? record one with --record-baseline)")
+    sys.exit(1)
+
+if regressions:
+    print(f"\n✘ {len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+    for line in regressions:
+        print(f"- {line}")
+    sys.exit(1)
+
+print(f"\n✔ No regressions beyond {args.tolerance:.0%} of baseline")
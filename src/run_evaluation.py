@@ -1,26 +1,30 @@
-import os
 import pandas as pd
 import matplotlib.pyplot as plt
 
+from engine.artifacts import artifact_exists, read_artifact
+
 # -----------------------------
 # Paths
 # -----------------------------
-DRIFT_PATH = "data/drift_scores.csv"
-EXPLAIN_PATH = "data/drift_explanations.csv"
+DRIFT_PATH = "data/drift_scores"
+EXPLAIN_PATH = "data/drift_explanations"
+ONSET_PATH = "data/drift_onsets"
 
 # -----------------------------
 # Basic validation
 # -----------------------------
-assert os.path.exists(DRIFT_PATH), "Missing drift_scores.csv"
-assert os.path.exists(EXPLAIN_PATH), "Missing drift_explanations.csv"
+assert artifact_exists(DRIFT_PATH), "Missing drift_scores artifact"
+assert artifact_exists(EXPLAIN_PATH), "Missing drift_explanations artifact"
+assert artifact_exists(ONSET_PATH), "Missing drift_onsets artifact"
 
 print("✔ Required files found")
 
 # -----------------------------
 # Load data
 # -----------------------------
-drift_df = pd.read_csv(DRIFT_PATH)
-explain_df = pd.read_csv(EXPLAIN_PATH)
+drift_df = read_artifact(DRIFT_PATH)
+explain_df = read_artifact(EXPLAIN_PATH)
+onset_df = read_artifact(ONSET_PATH)
 
 print(f"✔ Drift scores shape: {drift_df.shape}")
 print(f"✔ Drift explanations shape: {explain_df.shape}")
@@ -77,16 +81,10 @@ print("Expected: clear rise and sustained elevation")
 # =====================================================
 print("\n--- Drift Onset Sanity ---")
 
-THRESHOLD = 0.15
-onsets = []
-
-for user, u_df in drift_df.groupby("user_id"):
-    above = u_df[u_df["drift_score"] > THRESHOLD]
-    if len(above) >= 3:
-        onsets.append(above.iloc[0]["day"])
-
-if onsets:
-    onset_series = pd.Series(onsets)
+# Precomputed by the scoring stage: first run of consecutive days above
+# the drift threshold
+if len(onset_df):
+    onset_series = pd.Series(onset_df["onset_day"])
     print(onset_series.describe())
 else:
     print("No strong drift onsets detected")
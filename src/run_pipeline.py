@@ -0,0 +1,211 @@
+import argparse
+import os
+import time
+
+from engine.artifacts import (
+    ArtifactWriter,
+    artifact_exists,
+    iter_artifact_chunks,
+    iter_user_chunks,
+    read_artifact,
+    write_artifact,
+)
+from engine.leaderboard import Leaderboard
+from engine.metrics import write_stage_metrics
+from engine.onset import CONSECUTIVE_DAYS, DRIFT_THRESHOLD, onset_frame, score_onsets
+from engine.pipeline import run_sharded
+from engine.scorers import SCORING_MODES
+from engine.sketch import QuantileSketches, save_sketches
+from engine.store import remove_score_store, write_score_store
+
+# -----------------------------
+# Configuration
+# -----------------------------
+DATA_PATH = "data/synthetic_behavior"
+REPRESENTATION_PATH = "data/behavior_representations"
+DRIFT_PATH = "data/drift_scores"
+EXPLAIN_PATH = "data/drift_explanations"
+LEADERBOARD_PATH = "data/drift_leaderboard"
+ONSET_PATH = "data/drift_onsets"
+STORE_PATH = "data/score_store"
+SKETCH_PATH = "data/population_sketches.npz"
+
+# Trailing windows (days) and the statistics computed over each; all of
+# them share one set of accumulators
+WINDOW_SIZES = [7, 14, 30]
+WINDOW_STATISTICS = ["mean", "std", "min", "max"]
+WINDOW_SPECS = [(window, WINDOW_STATISTICS) for window in WINDOW_SIZES]
+
+# Representation columns that are scored (None scores every one)
+SCORE_STATISTICS = ["mean"]
+SCORE_WINDOWS = [14]
+
+REFERENCE_WINDOW = 30
+CURRENT_WINDOW = 14
+EPSILON = 1e-8
+TOP_K = 3
+
+SHARD_SIZE = 5_000  # users per shard
+
+# Drift scorer, any of engine.scorers.SCORING_MODES: "l2" (normalized
+# distance of window means), "zscore", "mahalanobis", "jensen_shannon",
+# "wasserstein" or "psi"
+SCORING_MODE = "l2"
+
+FEATURE_COLUMNS = [
+    "session_count",
+    "avg_session_duration",
+    "active_hours_entropy",
+    "action_type_entropy",
+    "inter_day_variability"
+]
+
+# -----------------------------
+# Arguments
+# -----------------------------
+parser = argparse.ArgumentParser(
+    description="Run representation, scoring and explanation sharded across cores"
+)
+parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                    help="worker processes (default: all cores)")
+parser.add_argument("--shard-size", type=int, default=SHARD_SIZE,
+                    help="users per shard")
+parser.add_argument("--chunk-rows", type=int, default=None,
+                    help="stream the input in user-aligned chunks of about this "
+                         "many rows (bounded memory; input grouped by user; "
+                         "output keeps the input's user order)")
+parser.add_argument("--scoring-mode", choices=SCORING_MODES, default=SCORING_MODE,
+                    help="registered drift scorer (engine.scorers.SCORERS)")
+args = parser.parse_args()
+
+# -----------------------------
+# Run pipeline
+# -----------------------------
+assert artifact_exists(DATA_PATH), "Missing synthetic_behavior artifact (run generate_data.py)"
+
+config = {
+    "feature_columns": FEATURE_COLUMNS,
+    "window_specs": WINDOW_SPECS,
+    "score_statistics": SCORE_STATISTICS,
+    "score_windows": SCORE_WINDOWS,
+    "reference_window": REFERENCE_WINDOW,
+    "current_window": CURRENT_WINDOW,
+    "epsilon": EPSILON,
+    "top_k": TOP_K,
+    "scoring_mode": args.scoring_mode,
+}
+
+start = time.perf_counter()
+
+if args.chunk_rows is None:
+    df = read_artifact(DATA_PATH)
+    rep_df, drift_df, explain_df, sketches = run_sharded(
+        df, config, args.workers, args.shard_size
+    )
+
+    # -----------------------------
+    # Save outputs
+    # -----------------------------
+    write_artifact(rep_df, REPRESENTATION_PATH)
+    write_artifact(drift_df, DRIFT_PATH)
+    leaderboard = Leaderboard.from_scores(drift_df)
+    onset_users, onset_days = score_onsets(drift_df, DRIFT_THRESHOLD, CONSECUTIVE_DAYS)
+    onset_df = onset_frame(onset_users, onset_days)
+    write_artifact(explain_df, EXPLAIN_PATH)
+    write_artifact(leaderboard.to_frame(), LEADERBOARD_PATH)
+    write_artifact(onset_df, ONSET_PATH)
+    write_score_store(STORE_PATH, drift_df, explain_df, leaderboard, onset_days)
+    save_sketches(sketches, SKETCH_PATH)
+
+    input_rows = len(df)
+    output_rows = [
+        len(rep_df), len(drift_df), len(explain_df), len(leaderboard), len(onset_df)
+    ]
+else:
+    # -----------------------------
+    # Streaming mode
+    # -----------------------------
+    # Only one chunk of input and its outputs are held in memory at a time;
+    # results are appended to the artifacts as each chunk finishes. Chunks
+    # hold whole users, so per-chunk leaderboard and onset rows are final;
+    # population sketches are merged chunk by chunk.
+    #
+    # Users come out in input order (batch mode sorts them by user id); each
+    # user's rows stay together and day-sorted. Sorting the whole output
+    # would need it all in memory, and every reader that relies on key order
+    # (score store, API indexes, leaderboard) sorts what it reads.
+    #
+    # The API serves the score store whenever one exists, so the previous
+    # run's store is removed before the artifacts start changing.
+    remove_score_store(STORE_PATH)
+
+    input_rows = 0
+    sketches = QuantileSketches.empty()
+    with ArtifactWriter(REPRESENTATION_PATH) as rep_out, \
+            ArtifactWriter(DRIFT_PATH) as drift_out, \
+            ArtifactWriter(EXPLAIN_PATH) as explain_out, \
+            ArtifactWriter(LEADERBOARD_PATH) as leaderboard_out, \
+            ArtifactWriter(ONSET_PATH) as onset_out:
+        chunks = iter_user_chunks(iter_artifact_chunks(DATA_PATH, args.chunk_rows))
+
+        for chunk in chunks:
+            rep_df, drift_df, explain_df, chunk_sketches = run_sharded(
+                chunk, config, args.workers, args.shard_size
+            )
+            sketches = QuantileSketches.merge([sketches, chunk_sketches])
+            rep_out.write(rep_df)
+            drift_out.write(drift_df)
+            explain_out.write(explain_df)
+            leaderboard_out.write(Leaderboard.from_scores(drift_df).to_frame())
+            onset_out.write(onset_frame(
+                *score_onsets(drift_df, DRIFT_THRESHOLD, CONSECUTIVE_DAYS)
+            ))
+            input_rows += len(chunk)
+
+    # The store holds every score in one set of arrays, so it is built from
+    # the finished artifacts; its leaderboard and onsets match batch mode
+    drift_df = read_artifact(DRIFT_PATH, columns=["user_id", "day", "drift_score"])
+    _, onset_days = score_onsets(drift_df, DRIFT_THRESHOLD, CONSECUTIVE_DAYS)
+    write_score_store(
+        STORE_PATH,
+        drift_df,
+        read_artifact(EXPLAIN_PATH),
+        Leaderboard.from_scores(drift_df),
+        onset_days,
+    )
+    save_sketches(sketches, SKETCH_PATH)
+
+    output_rows = [
+        rep_out.rows,
+        drift_out.rows,
+        explain_out.rows,
+        leaderboard_out.rows,
+        onset_out.rows,
+    ]
+
+elapsed = time.perf_counter() - start
+
+write_stage_metrics(
+    "pipeline",
+    elapsed,
+    {
+        "synthetic_behavior": input_rows,
+        "behavior_representations": output_rows[0],
+        "drift_scores": output_rows[1],
+        "drift_explanations": output_rows[2],
+        "drift_leaderboard": output_rows[3],
+        "drift_onsets": output_rows[4],
+    },
+)
+
+print(
+    f"Pipeline finished in {elapsed:.2f}s "
+    f"({input_rows / elapsed:,.0f} rows/sec, {args.workers} workers, "
+    f"{args.shard_size} users/shard)\n"
+    f"Representations: {output_rows[0]} rows\n"
+    f"Drift scores: {output_rows[1]} rows\n"
+    f"Drift explanations: {output_rows[2]} rows\n"
+    f"Leaderboard: {output_rows[3]} users\n"
+    f"Drift onsets: {output_rows[4]} users\n"
+    f"Population sketches: {len(sketches)} ({sketches.nbytes / 1e3:.0f} KB)"
+)
@@ -0,0 +1,186 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+from engine.artifacts import artifact_exists, read_artifact, write_artifact
+from engine.changepoint import (
+    changepoint_frame,
+    empty_detector_state,
+    feed_scores,
+    update_detectors,
+)
+from engine.metrics import write_stage_metrics
+from engine.sketch import (
+    QuantileSketches,
+    add_cohorts,
+    cohort_sketches,
+    load_sketches,
+    save_sketches,
+    user_cohorts,
+)
+from engine.incremental import (
+    ingest_day,
+    load_state,
+    save_state,
+    state_from_history,
+)
+
+# -----------------------------
+# Configuration
+# -----------------------------
+# Full history used to seed the state on the first run
+DATA_PATH = "data/synthetic_behavior"
+STATE_PATH = "data/incremental_state.npz"
+OUTPUT_DIR = "data/increments"
+
+# Change-point detectors (see detect_changepoints.py), seeded from the
+# batch drift scores on the first run
+DRIFT_PATH = "data/drift_scores"
+CHANGEPOINT_STATE_PATH = "data/changepoint_state.npz"
+CHANGEPOINT_OUTPUT_PATH = "data/drift_changepoints"
+
+# Population sketches (see build_sketches.py) gain the new day's sketches;
+# each user's signup cohort is kept alongside, seeded from the history
+SKETCH_PATH = "data/population_sketches.npz"
+COHORT_PATH = "data/sketch_cohorts.npz"
+
+WINDOW_SIZE = 14
+REFERENCE_WINDOW = 30
+CURRENT_WINDOW = 14
+EPSILON = 1e-8
+TOP_K = 3
+
+# Must match the mode the history was scored with (see compute_drift.py)
+SCORING_MODE = "l2"
+
+FEATURE_COLUMNS = [
+    "session_count",
+    "avg_session_duration",
+    "active_hours_entropy",
+    "action_type_entropy",
+    "inter_day_variability"
+]
+
+# -----------------------------
+# Arguments
+# -----------------------------
+parser = argparse.ArgumentParser(
+    description="Ingest one new day of behavior and emit only the new drift rows"
+)
+parser.add_argument("day_path", help="artifact stem of the new day's rows, e.g. data/day_90")
+args = parser.parse_args()
+
+# -----------------------------
+# Load new day
+# -----------------------------
+day_df = read_artifact(args.day_path)
+
+# A day without active users has nothing to ingest; state stays untouched
+if day_df.empty:
+    print(f"No rows in {args.day_path}; nothing ingested, state unchanged")
+    sys.exit(0)
+
+# -----------------------------
+# Load state
+# -----------------------------
+if os.path.exists(STATE_PATH):
+    state = load_state(STATE_PATH)
+else:
+    assert artifact_exists(DATA_PATH), "Missing synthetic_behavior artifact (run generate_data.py)"
+    state = state_from_history(
+        read_artifact(DATA_PATH),
+        FEATURE_COLUMNS,
+        WINDOW_SIZE,
+        REFERENCE_WINDOW,
+        CURRENT_WINDOW,
+    )
+    print(f"State seeded from history: {len(state['users'])} users")
+
+if os.path.exists(CHANGEPOINT_STATE_PATH):
+    detectors = load_state(CHANGEPOINT_STATE_PATH)
+elif artifact_exists(DRIFT_PATH):
+    detectors = feed_scores(
+        empty_detector_state(),
+        read_artifact(DRIFT_PATH, columns=["user_id", "day", "drift_score"]),
+    )
+else:
+    detectors = empty_detector_state()
+
+if os.path.exists(COHORT_PATH):
+    cohort_state = load_state(COHORT_PATH)
+    users, cohorts = cohort_state["users"], cohort_state["cohorts"]
+elif artifact_exists(DATA_PATH):
+    users, cohorts = user_cohorts(read_artifact(DATA_PATH, columns=["user_id", "day"]))
+else:
+    users, cohorts = user_cohorts(day_df.iloc[:0])
+
+# Sketches are per day, so a missing file only means earlier days have none
+sketches = (
+    load_sketches(SKETCH_PATH) if os.path.exists(SKETCH_PATH) else QuantileSketches.empty()
+)
+
+# -----------------------------
+# Ingest new day
+# -----------------------------
+start = time.perf_counter()
+state, drift_df, explain_df = ingest_day(
+    state,
+    day_df,
+    FEATURE_COLUMNS,
+    FEATURE_COLUMNS,
+    REFERENCE_WINDOW,
+    CURRENT_WINDOW,
+    EPSILON,
+    TOP_K,
+    SCORING_MODE,
+)
+
+# One new score per user advances the change-point detectors
+detectors = update_detectors(
+    detectors, drift_df["user_id"], drift_df["day"], drift_df["drift_score"]
+)
+changepoint_df = changepoint_frame(detectors)
+
+# The day's sketches are new keys; merging leaves earlier days unchanged
+users, cohorts = add_cohorts(users, cohorts, day_df)
+sketches = QuantileSketches.merge([
+    sketches, cohort_sketches(day_df, drift_df, FEATURE_COLUMNS, users, cohorts)
+])
+
+# -----------------------------
+# Save state + new rows
+# -----------------------------
+save_state(state, STATE_PATH)
+save_state(detectors, CHANGEPOINT_STATE_PATH)
+changepoint_file = write_artifact(changepoint_df, CHANGEPOINT_OUTPUT_PATH)
+save_state({"users": users, "cohorts": cohorts}, COHORT_PATH)
+save_sketches(sketches, SKETCH_PATH)
+
+os.makedirs(OUTPUT_DIR, exist_ok=True)
+day = int(np.max(day_df["day"]))
+drift_file = write_artifact(drift_df, f"{OUTPUT_DIR}/drift_scores_day_{day}")
+explain_file = write_artifact(explain_df, f"{OUTPUT_DIR}/drift_explanations_day_{day}")
+
+write_stage_metrics(
+    "daily_update",
+    time.perf_counter() - start,
+    {
+        "daily_input": len(day_df),
+        "drift_scores": len(drift_df),
+        "drift_explanations": len(explain_df),
+        "drift_changepoints": len(changepoint_df),
+        "population_sketches": len(sketches),
+    },
+)
+
+print(
+    f"Ingested {len(day_df)} rows for day {day}\n"
+    f"New drift scores: {drift_df.shape} -> {drift_file}\n"
+    f"New explanations: {explain_df.shape} -> {explain_file}\n"
+    f"Change-point detectors: {len(changepoint_df)} users -> {changepoint_file}\n"
+    f"Population sketches: {len(sketches)} -> {SKETCH_PATH}\n"
+    f"State saved to: {STATE_PATH}"
+)